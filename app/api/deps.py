@@ -2,29 +2,77 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
 
-from app.core.security import decode_token
+from app.core.security import decode_token_cached
 from app.db.crud import get_user
+from app.db.records import UserSnapshot
+from app.db.replicas import get_read_session
+from app.db.revocations import is_token_revoked
 from app.db.session import get_session
+from app.db.token_versions import get_token_version
+from app.db.user_cache import get_user_snapshot
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), session=Depends(get_session)
-):
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _decode_bearer(token: str) -> dict:
     try:
-        payload = decode_token(token)
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
+        payload = decode_token_cached(token)
     except JWTError:
-        raise credentials_exception
-    user = await get_user(session, user_id)
-    if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    # Refresh tokens are only accepted by /auth/refresh
+    if payload.get("sub") is None or payload.get("type") == "refresh":
+        raise _credentials_exception()
+    return payload
+
+
+async def get_token_payload(
+    token: str = Depends(oauth2_scheme), session=Depends(get_session)
+) -> dict:
+    """Decode the bearer token and reject it if it has been revoked."""
+    payload = _decode_bearer(token)
+    if await is_token_revoked(session, payload):
+        raise _credentials_exception()
+    return payload
+
+
+async def get_current_user(
+    payload: dict = Depends(get_token_payload), session=Depends(get_session)
+):
+    """Load the authenticated user from the database (for endpoints that mutate it)."""
+    user = await get_user(session, payload["sub"])
+    if user is None or user.token_version != payload.get("ver", 0):
+        raise _credentials_exception()
     return user
+
+
+async def get_current_principal(
+    payload: dict = Depends(get_token_payload),
+    session=Depends(get_read_session),
+    primary=Depends(get_session),
+) -> UserSnapshot:
+    """Resolve the authenticated user for read-only endpoints.
+
+    Tokens carrying user claims are trusted for their lifetime without loading
+    the user; claim-less tokens fall back to a (cached) user lookup, which may
+    be served by a replica. Either way the token version, which carries
+    revocation, is checked against the primary (through its cache), so replica
+    lag cannot let a revoked token through.
+    """
+    version = await get_token_version(primary, payload["sub"])
+    if version is None or version != payload.get("ver", 0):
+        raise _credentials_exception()
+    principal = UserSnapshot.from_claims(payload)
+    if principal is not None:
+        return principal
+    snapshot = await get_user_snapshot(session, payload["sub"])
+    if snapshot is None:
+        raise _credentials_exception()
+    return snapshot
@@ -1,50 +1,77 @@
 import os
-import re
-import secrets
 import smtplib
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from email.message import EmailMessage
+from typing import Optional, Union
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import JSONResponse
-from sqlmodel import select
+from jose import JWTError
 
+from app.api.deps import get_token_payload
+from app.core.config import settings
+from app.core.hashing import verify_password
 from app.core.logging import (
     SecurityEvent,
     log_account_lockout,
     log_auth_failure,
     log_auth_success,
     log_security_event,
+    logger,
 )
 from app.core.rate_limit import conditional_limit
-from app.core.security import create_access_token, create_refresh_token
-from app.db.crud import authenticate_user, create_user, get_user_by_email
+from app.core.security import (
+    create_access_token,
+    decode_token,
+    password_complexity_errors,
+)
+from app.db.crud import get_user, get_user_by_email, register_user, upgraded_hash
 from app.db.models import User
+from app.db.records import LoginRecord, UserSnapshot
+from app.db.refresh_tokens import (
+    get_refresh_token,
+    issue_refresh_token,
+    mark_rotated,
+    revoke_family,
+)
+from app.db.revocations import revoke_token
 from app.db.session import get_session
-from app.schemas.token import Token
-from app.schemas.user import UserCreate
+from app.db.user_cache import forget_user
+from app.db.user_queries import (
+    fetch_login_record,
+    record_failed_login,
+    record_successful_login,
+)
+from app.db.verification_tokens import (
+    consume_verification_token,
+    reissue_verification_token,
+)
+from app.schemas.token import LogoutRequest, RefreshRequest, Token
+from app.schemas.user import UserCreate, VerificationResendRequest
 
 router = APIRouter()
 
 
 def validate_password_complexity(password: str) -> None:
-    errors = []
-    if len(password) < 8:
-        errors.append("Password must be at least 8 characters long.")
-    if not re.search(r"[A-Z]", password):
-        errors.append("Password must contain at least one uppercase letter.")
-    if not re.search(r"[a-z]", password):
-        errors.append("Password must contain at least one lowercase letter.")
-    if not re.search(r"[0-9]", password):
-        errors.append("Password must contain at least one digit.")
-    if not re.search(r"[!@#$%^&*(),.?\":{}|<>]", password):
-        errors.append("Password must contain at least one special character.")
+    errors = password_complexity_errors(password)
     if errors:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail=" ".join(errors)
         )
 
 
+def issue_tokens(session, user: Union[User, LoginRecord], family_id=None) -> Token:
+    """Build an access/refresh pair; the refresh row is staged for the caller's commit"""
+    claims = None
+    if settings.STATELESS_ACCESS_TOKENS:
+        claims = UserSnapshot.from_user(user).to_claims()
+    access_token = create_access_token(
+        subject=str(user.id), claims=claims, token_version=user.token_version
+    )
+    refresh_token = issue_refresh_token(session, user, family_id=family_id)
+    return Token(access_token=access_token, refresh_token=refresh_token)
+
+
 def send_verification_email(email: str, token: str):
     smtp_host = os.getenv("SMTP_HOST")
     smtp_port = int(os.getenv("SMTP_PORT", "587"))
@@ -76,21 +103,21 @@ async def register(request: Request, user_in: UserCreate, session=Depends(get_se
 
     try:
         validate_password_complexity(user_in.password)
-        existing = await create_user(session, user_in.email, user_in.password)
-        # Generate verification token
-        token = secrets.token_urlsafe(16)
-        existing.email_verification_token = token
-        existing.email_verified = False
-        await session.commit()
-        await session.refresh(existing)
-        send_verification_email(existing.email, token)
+        created = await register_user(session, user_in.email, user_in.password)
+        if created is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered",
+            )
+        user_id, token = created
+        send_verification_email(user_in.email, token)
 
         # Log successful registration
         log_security_event(
             SecurityEvent(
                 event_type="user_registration",
-                user_id=str(existing.id),
-                email=existing.email,
+                user_id=str(user_id),
+                email=user_in.email,
                 ip_address=client_ip,
                 user_agent=user_agent,
                 success=True,
@@ -102,7 +129,7 @@ async def register(request: Request, user_in: UserCreate, session=Depends(get_se
             status_code=status.HTTP_201_CREATED,
             content={
                 "message": "user created, verification email sent",
-                "id": str(existing.id),
+                "id": str(user_id),
             },
         )
     except Exception as e:
@@ -122,27 +149,55 @@ async def register(request: Request, user_in: UserCreate, session=Depends(get_se
 
 @router.get("/verify-email")
 async def verify_email(token: str, session=Depends(get_session)):
-    result = await session.execute(
-        select(User).where(User.email_verification_token == token)
-    )
-    user = result.scalar_one_or_none()
+    user_id = await consume_verification_token(session, token)
+    user = await session.get(User, user_id) if user_id else None
     if not user:
+        await session.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or expired token"
         )
     user.email_verified = True
-    user.email_verification_token = None
     await session.commit()
+    forget_user(user.id)
     return {"message": "Email verified successfully"}
 
 
+@router.post("/resend-verification", status_code=status.HTTP_202_ACCEPTED)
+@conditional_limit("3/minute")
+async def resend_verification(
+    request: Request, body: VerificationResendRequest, session=Depends(get_session)
+):
+    """Mail a new verification link, replacing any outstanding one.
+
+    The response is the same whether or not the account exists or is verified.
+    """
+    user = await get_user_by_email(session, body.email)
+    if user is not None and user.is_active and not user.email_verified:
+        token = await reissue_verification_token(session, user.id)
+        await session.commit()
+        send_verification_email(user.email, token)
+        log_security_event(
+            SecurityEvent(
+                event_type="verification_resent",
+                user_id=str(user.id),
+                email=user.email,
+                ip_address=request.client.host if request.client else "unknown",
+                success=True,
+            )
+        )
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"message": "If the account needs verification, an email was sent"},
+    )
+
+
 @router.post("/login", response_model=Token)
 @conditional_limit("10/minute")
 async def login(request: Request, form_data: UserCreate, session=Depends(get_session)):
     client_ip = request.client.host if request.client else "unknown"
     user_agent = request.headers.get("user-agent", "")
 
-    user = await get_user_by_email(session, form_data.email)
+    user = await fetch_login_record(session, form_data.email)
     now = datetime.now(timezone.utc)
 
     # Check if account is locked
@@ -158,19 +213,19 @@ async def login(request: Request, form_data: UserCreate, session=Depends(get_ses
                 detail=f"Account locked until {locked_until}",
             )
 
-    # Authenticate user
-    authed_user = await authenticate_user(session, form_data.email, form_data.password)
-    if not authed_user:
-        # Increment failed_attempts
+    # Authenticate against the row fetched above (no second lookup)
+    authenticated = (
+        user is not None
+        and user.is_active
+        and await verify_password(form_data.password, user.hashed_password)
+    )
+    if not authenticated:
         if user:
-            user.failed_attempts += 1
-            # Lock account if too many failed attempts
-            if user.failed_attempts >= 5:
-                user.locked_until = now + timedelta(minutes=15)
-                user.failed_attempts = 0
-                log_account_lockout(form_data.email, client_ip, user_agent)
+            # Count the failure (and lock if needed) atomically in loginlockout
+            locked_until = await record_failed_login(session, user.id, now)
             await session.commit()
-            await session.refresh(user)
+            if locked_until is not None:
+                log_account_lockout(form_data.email, client_ip, user_agent)
 
         log_auth_failure(form_data.email, client_ip, "Invalid credentials", user_agent)
         raise HTTPException(
@@ -178,21 +233,124 @@ async def login(request: Request, form_data: UserCreate, session=Depends(get_ses
         )
 
     # Check if email is verified
-    if not authed_user.email_verified:
+    if not user.email_verified:
         log_auth_failure(form_data.email, client_ip, "Email not verified", user_agent)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Email not verified"
         )
 
-    # Reset failed_attempts on successful login
-    authed_user.failed_attempts = 0
-    authed_user.locked_until = None
+    # Only touch the user row when there is a counter, stale lock or hash to reset
+    new_hash = await upgraded_hash(user.hashed_password, form_data.password)
+    user_changed = await record_successful_login(session, user, new_hash)
+    tokens = issue_tokens(session, user)
     await session.commit()
-    await session.refresh(authed_user)
+    if user_changed:
+        forget_user(user.id)
+    if new_hash is not None:
+        logger.info(f"Rehashed password for user {user.id} at current cost")
 
     # Log successful login
-    log_auth_success(str(authed_user.id), authed_user.email, client_ip, user_agent)
+    log_auth_success(str(user.id), user.email, client_ip, user_agent)
 
-    access_token = create_access_token(subject=str(authed_user.id))
-    refresh_token = create_refresh_token(subject=str(authed_user.id))
-    return Token(access_token=access_token, refresh_token=refresh_token)
+    return tokens
+
+
+@router.post("/refresh", response_model=Token)
+@conditional_limit("30/minute")
+async def refresh(request: Request, body: RefreshRequest, session=Depends(get_session)):
+    """Swap a refresh token for a new token pair without re-entering the password"""
+    client_ip = request.client.host if request.client else "unknown"
+    user_agent = request.headers.get("user-agent", "")
+    invalid_token = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
+    )
+
+    try:
+        payload = decode_token(body.refresh_token)
+    except JWTError:
+        raise invalid_token
+    if payload.get("type") != "refresh" or not payload.get("jti"):
+        raise invalid_token
+
+    stored = await get_refresh_token(session, payload["jti"], body.refresh_token)
+    if stored is None:
+        raise invalid_token
+
+    if not await mark_rotated(session, stored.jti):
+        # A retired token came back: assume it leaked and kill the whole family
+        await revoke_family(session, stored.family_id)
+        await session.commit()
+        log_security_event(
+            SecurityEvent(
+                event_type="refresh_token_reuse",
+                user_id=str(stored.user_id),
+                ip_address=client_ip,
+                user_agent=user_agent,
+                success=False,
+                details="Rotated refresh token presented again, family revoked",
+            )
+        )
+        raise invalid_token
+
+    user = await get_user(session, payload["sub"])
+    if (
+        user is None
+        or not user.is_active
+        or user.token_version != payload.get("ver", 0)
+    ):
+        await session.commit()
+        raise invalid_token
+
+    tokens = issue_tokens(session, user, family_id=stored.family_id)
+    await session.commit()
+
+    log_security_event(
+        SecurityEvent(
+            event_type="token_refresh",
+            user_id=str(user.id),
+            ip_address=client_ip,
+            user_agent=user_agent,
+            success=True,
+        )
+    )
+
+    return tokens
+
+
+@router.post("/logout")
+async def logout(
+    request: Request,
+    body: Optional[LogoutRequest] = None,
+    payload: dict = Depends(get_token_payload),
+    session=Depends(get_session),
+):
+    """Revoke the presented access token and, if given, its refresh token family"""
+    client_ip = request.client.host if request.client else "unknown"
+
+    revoke_token(session, payload["jti"], payload["exp"])
+
+    if body is not None and body.refresh_token:
+        try:
+            refresh_payload = decode_token(body.refresh_token)
+        except JWTError:
+            refresh_payload = {}
+        if refresh_payload.get("sub") == payload["sub"]:
+            stored = await get_refresh_token(
+                session, refresh_payload.get("jti", ""), body.refresh_token
+            )
+            if stored is not None:
+                await revoke_family(session, stored.family_id)
+
+    await session.commit()
+
+    log_security_event(
+        SecurityEvent(
+            event_type="logout",
+            user_id=payload["sub"],
+            ip_address=client_ip,
+            user_agent=request.headers.get("user-agent", ""),
+            success=True,
+        )
+    )
+
+    return {"message": "Logged out successfully"}
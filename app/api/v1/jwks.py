@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Request, Response
+
+from app.core import security
+from app.core.config import settings
+
+router = APIRouter()
+
+
+@router.get("/.well-known/jwks.json")
+async def read_jwks(request: Request):
+    """Public signing keys for offline token verification"""
+    body, etag = security.keyring.jwks()
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.JWKS_MAX_AGE_SECONDS}",
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
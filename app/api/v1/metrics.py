@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends
+
+from app.api.v1.users import get_current_admin_user
+from app.core.hashing import hasher
+from app.core.security import decoded_token_cache_stats
+from app.db.records import UserSnapshot
+from app.db.replicas import replica_router
+from app.db.revocations import revocation_index
+from app.db.session import engine, pool_stats
+from app.db.token_versions import cache_stats as token_version_cache_stats
+from app.db.user_cache import cache_stats as user_cache_stats
+
+router = APIRouter()
+
+
+@router.get("/")
+async def read_metrics(admin_user: UserSnapshot = Depends(get_current_admin_user)):
+    """Runtime metrics for capacity planning (admin only)"""
+    return {
+        "db_pool": pool_stats(engine),
+        "db_replicas": replica_router.stats(),
+        "password_hashing": hasher.snapshot(),
+        "decoded_token_cache": decoded_token_cache_stats(),
+        "token_version_cache": token_version_cache_stats(),
+        "user_cache": user_cache_stats(),
+        "revocation_index": revocation_index.stats(),
+    }
@@ -1,23 +1,40 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select
 
-from app.api.deps import get_current_user
+from app.api.deps import get_current_principal, get_current_user
+from app.core.config import settings
+from app.core.hashing import hash_password
 from app.core.logging import SecurityEvent, log_security_event, log_user_action
-from app.core.security import get_password_hash
-from app.db.crud import create_user, get_user, get_user_by_email
+from app.db.bulk_import import ImportLimitError, import_users
+from app.db.crud import (
+    count_users,
+    create_user,
+    get_user,
+    is_last_active_admin,
+    list_users_offset,
+    list_users_page,
+    user_filters,
+)
+from app.db.export import EXPORT_FORMATS, export_users, parse_columns
 from app.db.models import User
-from app.db.session import get_session
+from app.db.records import UserSnapshot
+from app.db.replicas import get_read_session
+from app.db.session import get_session, get_session_factory
+from app.db.token_versions import bump_token_version, forget_token_version
+from app.db.user_cache import forget_user, get_user_snapshot
+from app.db.user_queries import clear_login_lockout, fetch_user_snapshot_by_email
 from app.schemas.user import UserCreate, UserRead, UserUpdate
 
 router = APIRouter()
 
 
 async def get_current_admin_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: UserSnapshot = Depends(get_current_principal),
+) -> UserSnapshot:
     """Dependency to get current admin user"""
     if not current_user.is_superuser:
         raise HTTPException(
@@ -27,9 +44,9 @@ async def get_current_admin_user(
 
 
 @router.get("/me", response_model=UserRead)
-async def read_me(current_user=Depends(get_current_user)):
+async def read_me(current_user: UserSnapshot = Depends(get_current_principal)):
     """Get current user profile"""
-    return current_user
+    return JSONResponse(current_user.to_read())
 
 
 @router.put("/me", response_model=UserRead)
@@ -44,8 +61,8 @@ async def update_me(
 
     # Update fields if provided
     if user_update.email is not None:
-        # Check if email already exists
-        existing_user = await get_user_by_email(session, user_update.email)
+        # Check if email already exists (uncached: a stale entry would block it)
+        existing_user = await fetch_user_snapshot_by_email(session, user_update.email)
         if existing_user and existing_user.id != current_user.id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -56,10 +73,13 @@ async def update_me(
         current_user.email_verified = False
 
     if user_update.password is not None:
-        current_user.hashed_password = get_password_hash(user_update.password)
+        current_user.hashed_password = await hash_password(user_update.password)
+        bump_token_version(current_user)
 
     await session.commit()
     await session.refresh(current_user)
+    forget_token_version(current_user.id)
+    forget_user(current_user.id)
 
     # Log user update
     log_user_action("profile_update", str(current_user.id), ip_address=client_ip)
@@ -78,6 +98,8 @@ async def delete_me(
 
     await session.delete(current_user)
     await session.commit()
+    forget_token_version(current_user.id)
+    forget_user(current_user.id)
 
     # Log account deletion
     log_security_event(
@@ -97,26 +119,42 @@ async def delete_me(
 # Admin endpoints
 @router.get("/", response_model=List[UserRead])
 async def list_users(
-    skip: int = 0,
-    limit: int = 100,
-    admin_user: User = Depends(get_current_admin_user),
-    session: AsyncSession = Depends(get_session),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    skip: int = Query(0, ge=0, deprecated=True),
+    is_active: Optional[bool] = None,
+    is_superuser: Optional[bool] = None,
+    email_verified: Optional[bool] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    include_total: bool = False,
+    admin_user: UserSnapshot = Depends(get_current_admin_user),
+    session: AsyncSession = Depends(get_read_session),
 ):
-    """List all users (admin only)"""
-    statement = select(User).offset(skip).limit(limit)
-    result = await session.execute(statement)
-    users = result.scalars().all()
+    """List users oldest first (admin only); follow X-Next-Cursor for the next page"""
+    filters = user_filters(
+        is_active, is_superuser, email_verified, created_after, created_before
+    )
+    headers = {}
+    if skip and not cursor:
+        # Legacy offset paging, kept for existing clients
+        users = await list_users_offset(session, filters, limit, skip)
+    else:
+        try:
+            users, next_cursor = await list_users_page(session, filters, limit, cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+    if include_total:
+        headers["X-Total-Count-Estimate"] = str(await count_users(session, filters))
 
-    # Log admin action (include IP if available)
-    client_ip = None
-    try:
-        pass  # local import to avoid circular if any
-        # admin_user dependency chain might not provide request directly; ignore if unavailable
-    except Exception:
-        pass
-    log_user_action("list_users", str(admin_user.id), ip_address=client_ip)
+    log_user_action("list_users", str(admin_user.id))
 
-    return users
+    # Records are already in the UserRead shape: skip response model validation
+    return JSONResponse([user.to_read() for user in users], headers=headers)
 
 
 @router.post("/", response_model=UserRead, status_code=status.HTTP_201_CREATED)
@@ -124,18 +162,22 @@ async def create_user_admin(
     request: Request,
     user_in: UserCreate,
     is_superuser: bool = False,
-    admin_user: User = Depends(get_current_admin_user),
+    admin_user: UserSnapshot = Depends(get_current_admin_user),
     session: AsyncSession = Depends(get_session),
 ):
     """Create a new user (admin only)"""
     client_ip = request.client.host if request.client else "unknown"
 
     try:
-        new_user = await create_user(session, user_in.email, user_in.password)
-        new_user.is_superuser = is_superuser
-        new_user.email_verified = True  # Admin-created users are pre-verified
+        # Admin-created users are pre-verified
+        new_user = await create_user(
+            session,
+            user_in.email,
+            user_in.password,
+            is_superuser=is_superuser,
+            email_verified=True,
+        )
         await session.commit()
-        await session.refresh(new_user)
 
         # Log admin action
         log_security_event(
@@ -153,14 +195,97 @@ async def create_user_admin(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
+@router.get("/export")
+async def export_users_admin(
+    format: str = "ndjson",
+    columns: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    is_superuser: Optional[bool] = None,
+    email_verified: Optional[bool] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    admin_user: UserSnapshot = Depends(get_current_admin_user),
+    session_factory=Depends(get_session_factory),
+):
+    """Stream all matching users as NDJSON or CSV (admin only)"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown export format"
+        )
+    try:
+        selected = parse_columns(columns)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    filters = user_filters(
+        is_active, is_superuser, email_verified, created_after, created_before
+    )
+
+    log_user_action("export_users", str(admin_user.id))
+
+    return StreamingResponse(
+        export_users(session_factory, selected, format, filters),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'},
+    )
+
+
+@router.post("/import")
+async def import_users_admin(
+    request: Request,
+    admin_user: UserSnapshot = Depends(get_current_admin_user),
+    session_factory=Depends(get_session_factory),
+):
+    """Bulk-create users from an NDJSON request body (admin only)"""
+    client_ip = request.client.host if request.client else "unknown"
+
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > (
+        settings.BULK_IMPORT_MAX_BODY_BYTES
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Import body exceeds {settings.BULK_IMPORT_MAX_BODY_BYTES} bytes",
+        )
+    try:
+        # One password per pool task, so logins never queue behind a long chunk
+        report = await import_users(
+            session_factory,
+            request.stream(),
+            max_bytes=settings.BULK_IMPORT_MAX_BODY_BYTES,
+            max_line_bytes=settings.BULK_IMPORT_MAX_LINE_BYTES,
+            max_plaintext=settings.BULK_IMPORT_MAX_PLAINTEXT_ROWS,
+            hash_chunk_size=1,
+        )
+    except ImportLimitError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"{e}; batches before it were committed and re-running is safe",
+        )
+
+    log_security_event(
+        SecurityEvent(
+            event_type="admin_bulk_import",
+            user_id=str(admin_user.id),
+            ip_address=client_ip,
+            success=True,
+            details=(
+                f"Imported {report['inserted']} users "
+                f"({report['conflicts']} conflicts, {report['invalid']} invalid)"
+            ),
+        )
+    )
+
+    return report
+
+
 @router.get("/{user_id}", response_model=UserRead)
 async def get_user_by_id(
     user_id: str,
-    admin_user: User = Depends(get_current_admin_user),
-    session: AsyncSession = Depends(get_session),
+    admin_user: UserSnapshot = Depends(get_current_admin_user),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """Get user by ID (admin only)"""
-    user = await get_user(session, user_id)
+    user = await get_user_snapshot(session, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -169,7 +294,7 @@ async def get_user_by_id(
     # Log admin action
     log_user_action("view_user", str(admin_user.id), user_id)
 
-    return user
+    return JSONResponse(user.to_read())
 
 
 @router.put("/{user_id}", response_model=UserRead)
@@ -177,7 +302,7 @@ async def update_user_admin(
     user_id: str,
     user_update: UserUpdate,
     request: Request,
-    admin_user: User = Depends(get_current_admin_user),
+    admin_user: UserSnapshot = Depends(get_current_admin_user),
     session: AsyncSession = Depends(get_session),
 ):
     """Update user (admin only)"""
@@ -191,8 +316,8 @@ async def update_user_admin(
 
     # Update fields if provided
     if user_update.email is not None:
-        # Check if email already exists
-        existing_user = await get_user_by_email(session, user_update.email)
+        # Check if email already exists (uncached: a stale entry would block it)
+        existing_user = await fetch_user_snapshot_by_email(session, user_update.email)
         if existing_user and existing_user.id != user.id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -201,10 +326,13 @@ async def update_user_admin(
         user.email = user_update.email
 
     if user_update.password is not None:
-        user.hashed_password = get_password_hash(user_update.password)
+        user.hashed_password = await hash_password(user_update.password)
+        bump_token_version(user)
 
     await session.commit()
     await session.refresh(user)
+    forget_token_version(user.id)
+    forget_user(user.id)
 
     # Log admin action
     log_security_event(
@@ -224,7 +352,7 @@ async def update_user_admin(
 async def activate_user(
     user_id: str,
     request: Request,
-    admin_user: User = Depends(get_current_admin_user),
+    admin_user: UserSnapshot = Depends(get_current_admin_user),
     session: AsyncSession = Depends(get_session),
 ):
     """Activate user account (admin only)"""
@@ -237,9 +365,9 @@ async def activate_user(
         )
 
     user.is_active = True
-    user.failed_attempts = 0
-    user.locked_until = None
+    await clear_login_lockout(session, user.id)
     await session.commit()
+    forget_user(user.id)
 
     # Log admin action
     log_security_event(
@@ -259,7 +387,7 @@ async def activate_user(
 async def deactivate_user(
     user_id: str,
     request: Request,
-    admin_user: User = Depends(get_current_admin_user),
+    admin_user: UserSnapshot = Depends(get_current_admin_user),
     session: AsyncSession = Depends(get_session),
 ):
     """Deactivate user account (admin only)"""
@@ -272,20 +400,17 @@ async def deactivate_user(
         )
 
     # Prevent deactivating the last superuser
-    if user.is_superuser:
-        statement = select(User).where(
-            User.is_superuser is True, User.is_active is True
+    if await is_last_active_admin(session, user):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot deactivate the last active admin",
         )
-        result = await session.execute(statement)
-        active_admins = result.scalars().all()
-        if len(active_admins) <= 1:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Cannot deactivate the last active admin",
-            )
 
     user.is_active = False
+    bump_token_version(user)
     await session.commit()
+    forget_token_version(user.id)
+    forget_user(user.id)
 
     # Log admin action
     log_security_event(
@@ -305,7 +430,7 @@ async def deactivate_user(
 async def delete_user_admin(
     user_id: str,
     request: Request,
-    admin_user: User = Depends(get_current_admin_user),
+    admin_user: UserSnapshot = Depends(get_current_admin_user),
     session: AsyncSession = Depends(get_session),
 ):
     """Delete user (admin only)"""
@@ -318,18 +443,16 @@ async def delete_user_admin(
         )
 
     # Prevent deleting the last superuser
-    if user.is_superuser:
-        statement = select(User).where(User.is_superuser is True)
-        result = await session.execute(statement)
-        all_admins = result.scalars().all()
-        if len(all_admins) <= 1:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Cannot delete the last admin",
-            )
+    if await is_last_active_admin(session, user):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot delete the last admin",
+        )
 
     await session.delete(user)
     await session.commit()
+    forget_token_version(user.id)
+    forget_user(user.id)
 
     # Log admin action
     log_security_event(
@@ -343,3 +466,38 @@ async def delete_user_admin(
     )
 
     return {"message": f"User {user.email} deleted successfully"}
+
+
+@router.post("/{user_id}/revoke-tokens")
+async def revoke_user_tokens(
+    user_id: str,
+    request: Request,
+    admin_user: UserSnapshot = Depends(get_current_admin_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """Revoke all access and refresh tokens of a user (admin only)"""
+    client_ip = request.client.host if request.client else "unknown"
+
+    user = await get_user(session, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+
+    bump_token_version(user)
+    await session.commit()
+    forget_token_version(user.id)
+    forget_user(user.id)
+
+    # Log admin action
+    log_security_event(
+        SecurityEvent(
+            event_type="admin_token_revocation",
+            user_id=str(admin_user.id),
+            ip_address=client_ip,
+            success=True,
+            details=f"Revoked all tokens of user {user.email}",
+        )
+    )
+
+    return {"message": f"Tokens of user {user.email} revoked successfully"}
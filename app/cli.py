@@ -0,0 +1,246 @@
+"""
+Operational command line for the auth service.
+
+Usage:
+    python -m app.cli calibrate-bcrypt [--target-ms 250]
+    python -m app.cli purge-refresh-tokens
+    python -m app.cli purge-revoked-tokens
+    python -m app.cli purge-verification-tokens
+    python -m app.cli backfill-email-keys [--batch-size 1000]
+    python -m app.cli export-users [--format csv] [--columns id,email] [--output FILE]
+    python -m app.cli import-users FILE [--batch-size 5000]
+    python -m app.cli bench-jwt [--iterations 20000]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import timeit
+import uuid
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from jose import jwt
+
+from app.core.config import settings
+from app.core.jwt_codec import JWTCodec
+from app.core.security import calibrate_bcrypt_rounds
+from app.db.bulk_import import import_users
+from app.db.email_keys import BATCH_SIZE, backfill_email_keys
+from app.db.export import EXPORT_FORMATS, export_users, parse_columns
+from app.db.refresh_tokens import purge_expired_refresh_tokens
+from app.db.revocations import purge_expired_revocations
+from app.db.session import async_session, engine
+from app.db.verification_tokens import purge_expired_verification_tokens
+
+
+def calibrate_bcrypt(args: argparse.Namespace) -> None:
+    rounds, elapsed_ms = calibrate_bcrypt_rounds(
+        args.target_ms, args.min_rounds, args.max_rounds
+    )
+    print(f"Selected {rounds} rounds ({elapsed_ms:.1f}ms per hash on this host)")
+    print(f"Set BCRYPT_ROUNDS={rounds} to pin this cost for every worker")
+
+
+def purge_refresh_tokens(args: argparse.Namespace) -> None:
+    async def run() -> int:
+        async with async_session() as session:
+            return await purge_expired_refresh_tokens(session)
+
+    print(f"Deleted {asyncio.run(run())} expired refresh tokens")
+
+
+def purge_revoked_tokens(args: argparse.Namespace) -> None:
+    async def run() -> int:
+        async with async_session() as session:
+            return await purge_expired_revocations(session)
+
+    print(f"Deleted {asyncio.run(run())} expired token revocations")
+
+
+def purge_verification_tokens(args: argparse.Namespace) -> None:
+    async def run() -> int:
+        async with async_session() as session:
+            return await purge_expired_verification_tokens(session)
+
+    print(f"Deleted {asyncio.run(run())} expired email verification tokens")
+
+
+def backfill_email_keys_command(args: argparse.Namespace) -> None:
+    async def run() -> tuple[int, list[str]]:
+        async with engine.connect() as conn:
+            # Autocommit: every batch is its own short transaction
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            return await conn.run_sync(backfill_email_keys, args.batch_size)
+
+    updated, duplicates = asyncio.run(run())
+    print(f"Backfilled email keys for {updated} users")
+    for email in duplicates:
+        print(f"Duplicate up to case, left without a key: {email}")
+
+
+def export_users_command(args: argparse.Namespace) -> None:
+    columns = parse_columns(args.columns)
+
+    async def run() -> None:
+        out = open(args.output, "w", newline="") if args.output else sys.stdout
+        try:
+            async for chunk in export_users(async_session, columns, args.format):
+                out.write(chunk)
+        finally:
+            if args.output:
+                out.close()
+
+    asyncio.run(run())
+
+
+def import_users_command(args: argparse.Namespace) -> None:
+    def progress(report: dict) -> None:
+        print(
+            f"batch {report['batches']}: {report['inserted']} inserted, "
+            f"{report['conflicts']} conflicts, {report['invalid']} invalid "
+            f"({report['rows_per_second']:,.0f} rows/s)",
+            file=sys.stderr,
+        )
+
+    async def chunks():
+        source = open(args.file, "rb") if args.file != "-" else sys.stdin.buffer
+        try:
+            while block := source.read(1 << 20):
+                yield block
+        finally:
+            if args.file != "-":
+                source.close()
+
+    async def run() -> dict:
+        return await import_users(async_session, chunks(), args.batch_size, progress)
+
+    print(json.dumps(asyncio.run(run()), indent=2))
+
+
+def _pem_pair(private_key) -> tuple[str, str]:
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return private_pem.decode(), public_pem.decode()
+
+
+def bench_jwt(args: argparse.Namespace) -> None:
+    claims = {
+        "sub": str(uuid.uuid4()),
+        "exp": int(time.time()) + 3600,
+        "jti": str(uuid.uuid4()),
+        "ver": 0,
+        "type": "access",
+    }
+    ec_private, ec_public = _pem_pair(ec.generate_private_key(ec.SECP256R1()))
+    ed_private, _ = _pem_pair(ed25519.Ed25519PrivateKey.generate())
+    # (algorithm, codec, jose signing key, jose verification key)
+    cases = [
+        (
+            "HS256",
+            JWTCodec("HS256", kid="bench", secret=settings.SECRET_KEY),
+            settings.SECRET_KEY,
+            settings.SECRET_KEY,
+        ),
+        (
+            "ES256",
+            JWTCodec("ES256", kid="bench", private_key=ec_private),
+            ec_private,
+            ec_public,
+        ),
+        ("EdDSA", JWTCodec("EdDSA", kid="bench", private_key=ed_private), None, None),
+    ]
+
+    def rate(func) -> str:
+        per_second = args.iterations / timeit.timeit(func, number=args.iterations)
+        return f"{per_second:>12,.0f}"
+
+    print(f"{'algorithm':<10}{'impl':<8}{'encode/s':>12}{'decode/s':>12}")
+    for algorithm, codec, sign_key, verify_key in cases:
+        token = codec.encode(claims)
+        encode = rate(lambda: codec.encode(claims))
+        decode = rate(lambda: codec.decode(token))
+        print(f"{algorithm:<10}{'codec':<8}{encode}{decode}")
+        if sign_key is None:
+            print(f"{algorithm:<10}{'jose':<8}{'unsupported':>24}")
+            continue
+        token = jwt.encode(claims, sign_key, algorithm=algorithm)
+        encode = rate(lambda: jwt.encode(claims, sign_key, algorithm=algorithm))
+        decode = rate(lambda: jwt.decode(token, verify_key, algorithms=[algorithm]))
+        print(f"{algorithm:<10}{'jose':<8}{encode}{decode}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    calibrate = commands.add_parser(
+        "calibrate-bcrypt", help="Benchmark bcrypt and suggest a cost factor"
+    )
+    calibrate.add_argument("--target-ms", type=int, default=settings.BCRYPT_TARGET_MS)
+    calibrate.add_argument("--min-rounds", type=int, default=settings.BCRYPT_MIN_ROUNDS)
+    calibrate.add_argument("--max-rounds", type=int, default=settings.BCRYPT_MAX_ROUNDS)
+    calibrate.set_defaults(handler=calibrate_bcrypt)
+
+    purge = commands.add_parser(
+        "purge-refresh-tokens", help="Delete expired refresh token rows"
+    )
+    purge.set_defaults(handler=purge_refresh_tokens)
+
+    purge_revoked = commands.add_parser(
+        "purge-revoked-tokens", help="Delete revocations of expired access tokens"
+    )
+    purge_revoked.set_defaults(handler=purge_revoked_tokens)
+
+    purge_verification = commands.add_parser(
+        "purge-verification-tokens", help="Delete expired email verification tokens"
+    )
+    purge_verification.set_defaults(handler=purge_verification_tokens)
+
+    backfill = commands.add_parser(
+        "backfill-email-keys", help="Fill in missing case-insensitive email keys"
+    )
+    backfill.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    backfill.set_defaults(handler=backfill_email_keys_command)
+
+    export = commands.add_parser(
+        "export-users", help="Stream the users table as NDJSON or CSV"
+    )
+    export.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="ndjson")
+    export.add_argument("--columns", help="Comma-separated columns to include")
+    export.add_argument("--output", help="File to write (default: stdout)")
+    export.set_defaults(handler=export_users_command)
+
+    bulk_import = commands.add_parser(
+        "import-users", help="Bulk-create users from an NDJSON file ('-' for stdin)"
+    )
+    bulk_import.add_argument("file")
+    bulk_import.add_argument(
+        "--batch-size", type=int, default=settings.BULK_IMPORT_BATCH_SIZE
+    )
+    bulk_import.set_defaults(handler=import_users_command)
+
+    bench = commands.add_parser(
+        "bench-jwt", help="Compare token encode/decode throughput with python-jose"
+    )
+    bench.add_argument("--iterations", type=int, default=20000)
+    bench.set_defaults(handler=bench_jwt)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
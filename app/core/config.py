@@ -7,6 +7,40 @@ class Settings(BaseSettings):
         default="postgresql+asyncpg://postgres:password@db:5432/authdb",
         description="Database connection URL",
     )
+    DATABASE_REPLICA_URLS: str = Field(
+        default="", description="Comma-separated read replica URLs (empty = none)"
+    )
+    DATABASE_REPLICA_STRATEGY: str = Field(
+        default="round_robin",
+        description="Replica selection: round_robin or least_latency",
+    )
+    REPLICA_HEALTH_CHECK_INTERVAL_SECONDS: int = Field(
+        default=5, description="How often replicas are probed"
+    )
+    REPLICA_HEALTH_CHECK_TIMEOUT_SECONDS: float = Field(
+        default=2.0, description="Probe timeout before a replica is skipped"
+    )
+    READ_YOUR_WRITES_SECONDS: int = Field(
+        default=10,
+        description="How long a client reads from the primary after writing "
+        "(should exceed replication lag)",
+    )
+    DB_POOL_SIZE: int = Field(
+        default=10, description="Persistent connections per worker process"
+    )
+    DB_MAX_OVERFLOW: int = Field(
+        default=20, description="Extra connections opened under burst load"
+    )
+    DB_POOL_TIMEOUT_SECONDS: float = Field(
+        default=30.0, description="Longest a request waits for a pooled connection"
+    )
+    DB_POOL_PRE_PING: bool = Field(
+        default=True, description="Check connections are alive before reuse"
+    )
+    DB_POOL_RECYCLE_SECONDS: int = Field(
+        default=1800,
+        description="Replace connections older than this (-1 = never)",
+    )
     SECRET_KEY: str = Field(
         default="changeme", description="Secret key for JWT token generation"
     )
@@ -17,6 +51,55 @@ class Settings(BaseSettings):
         default=7, description="Refresh token expiration time in days"
     )
     ALGORITHM: str = Field(default="HS256", description="JWT signing algorithm")
+    JWT_KEYS: str = Field(
+        default="",
+        description="JSON list of signing keys (kid, secret, algorithm, "
+        "active_from, retire_at); empty = SECRET_KEY only",
+    )
+    JWKS_MAX_AGE_SECONDS: int = Field(
+        default=300, description="Cache-Control max-age of the published JWKS"
+    )
+    DECODED_TOKEN_CACHE_SIZE: int = Field(
+        default=10000, description="Verified bearer tokens cached per worker (0 = off)"
+    )
+    DECODED_TOKEN_CACHE_TTL_SECONDS: int = Field(
+        default=300,
+        description="Longest a verified token is reused without re-checking its "
+        "signature (bounds how late a key retirement takes effect)",
+    )
+    USER_CACHE_SIZE: int = Field(
+        default=10000, description="Cached user records per worker (0 = off)"
+    )
+    USER_CACHE_TTL_SECONDS: int = Field(
+        default=30, description="How long a worker serves a cached user record"
+    )
+    TOKEN_VERSION_CACHE_TTL_SECONDS: int = Field(
+        default=30,
+        description="How long a worker trusts a cached per-user token version",
+    )
+    TOKEN_VERSION_CACHE_SIZE: int = Field(
+        default=10000, description="Maximum cached per-user token versions"
+    )
+    REVOCATION_FILTER_CAPACITY: int = Field(
+        default=10000, description="Revoked tokens per Bloom filter before chaining"
+    )
+    REVOCATION_FILTER_ERROR_RATE: float = Field(
+        default=0.01, description="Bloom filter false-positive rate"
+    )
+    REVOCATION_SYNC_INTERVAL_SECONDS: int = Field(
+        default=10, description="How often workers pull new revocations (0 = never)"
+    )
+    REVOCATION_SYNC_OVERLAP_SECONDS: int = Field(
+        default=120,
+        description="Window re-read on each sync for late-committed revocations",
+    )
+    STATELESS_ACCESS_TOKENS: bool = Field(
+        default=False,
+        description="Embed user claims in access tokens and trust them for their TTL",
+    )
+    EMAIL_VERIFICATION_EXPIRE_HOURS: int = Field(
+        default=24, description="How long an email verification link stays valid"
+    )
     DEBUG: bool = Field(default=False, description="Debug mode")
     MAX_LOGIN_ATTEMPTS: int = Field(
         default=5, description="Maximum login attempts before lockout"
@@ -24,6 +107,58 @@ class Settings(BaseSettings):
     LOCKOUT_DURATION_MINUTES: int = Field(
         default=15, description="Account lockout duration in minutes"
     )
+    BCRYPT_ROUNDS: int = Field(
+        default=12, description="Bcrypt cost factor used when not calibrating"
+    )
+    BCRYPT_CALIBRATE_ON_STARTUP: bool = Field(
+        default=False, description="Benchmark bcrypt at startup to pick the cost"
+    )
+    BCRYPT_TARGET_MS: int = Field(
+        default=250, description="Per-hash latency budget used by calibration"
+    )
+    BCRYPT_MIN_ROUNDS: int = Field(
+        default=10, description="Lowest cost calibration may select"
+    )
+    BCRYPT_MAX_ROUNDS: int = Field(
+        default=16, description="Highest cost calibration may select"
+    )
+    PASSWORD_HASH_WORKERS: int = Field(
+        default=0,
+        description="Processes in the password hashing pool (0 = one per CPU core)",
+    )
+    PASSWORD_HASH_MAX_IN_FLIGHT: int = Field(
+        default=0,
+        description="Concurrent hash operations admitted (0 = twice the pool size)",
+    )
+    PASSWORD_HASH_MAX_WAIT_SECONDS: float = Field(
+        default=2.0,
+        description="Longest a request waits for a hashing slot before a 503",
+    )
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = Field(
+        default=1, description="Retry-After value sent when hashing is saturated"
+    )
+    BULK_IMPORT_BATCH_SIZE: int = Field(
+        default=5000, description="Users inserted (and committed) per import batch"
+    )
+    BULK_IMPORT_HASH_CHUNK_SIZE: int = Field(
+        default=16, description="Plaintext passwords hashed per pool task on import"
+    )
+    BULK_IMPORT_HASH_CONCURRENCY: int = Field(
+        default=0,
+        description="Hash tasks an import keeps in flight (0 = half the pool)",
+    )
+    BULK_IMPORT_MAX_BODY_BYTES: int = Field(
+        default=64 * 1024 * 1024,
+        description="Largest NDJSON body POST /users/import reads",
+    )
+    BULK_IMPORT_MAX_LINE_BYTES: int = Field(
+        default=16 * 1024, description="Longest NDJSON line POST /users/import accepts"
+    )
+    BULK_IMPORT_MAX_PLAINTEXT_ROWS: int = Field(
+        default=100,
+        description="Plaintext passwords one POST /users/import may hash; larger "
+        "imports must be pre-hashed or go through the CLI",
+    )
 
     model_config = {"env_file": ".env", "case_sensitive": True, "extra": "ignore"}
 
@@ -0,0 +1,20 @@
+"""
+Email address normalization.
+Accounts are keyed by a normalized form of their email so that lookups and
+uniqueness ignore case: the local part is casefolded and the domain converted
+to its IDNA (ASCII) form, so ``Bob@Bücher.example`` and
+``bob@xn--bcher-kva.example`` are the same account.
+"""
+
+
+def normalize_email(email: str) -> str:
+    """Lookup key for ``email``; the address as entered is stored separately"""
+    local, at, domain = email.strip().rpartition("@")
+    if not at:
+        return email.strip().casefold()
+    domain = domain.rstrip(".").casefold()
+    try:
+        domain = domain.encode("idna").decode("ascii")
+    except UnicodeError:
+        pass  # Not a valid IDNA name; the casefolded form is still a stable key
+    return f"{local.casefold()}@{domain}"
@@ -0,0 +1,212 @@
+"""
+Password hashing executor.
+Runs bcrypt hashing and verification in a dedicated process pool so a login or
+registration never blocks the event loop while a hash is being computed.
+Admission is bounded: once too many hashes are in flight, callers wait briefly
+for a slot and are then rejected with HashingOverloadedError (served as 503).
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+
+from app.core import security
+from app.core.config import settings
+from app.core.logging import logger
+
+
+class HashingOverloadedError(Exception):
+    """Raised when no hashing slot frees up within the configured wait."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing capacity exhausted")
+        self.retry_after = retry_after
+
+
+@dataclass
+class HashingStats:
+    """Counters describing the hashing pool workload."""
+
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    in_flight: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+
+
+class PasswordHasher:
+    """Process pool wrapper exposing awaitable hash/verify operations."""
+
+    def __init__(
+        self,
+        workers: int = 0,
+        max_in_flight: int = 0,
+        max_wait: float = 2.0,
+        retry_after: int = 1,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or self.workers * 2
+        self.max_wait = max_wait
+        self.retry_after = retry_after
+        self.stats = HashingStats()
+        self._executor: ProcessPoolExecutor | None = None
+        self._waiters: deque[asyncio.Future] = deque()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def _acquire_slot(self) -> None:
+        if self.stats.in_flight < self.max_in_flight and not self._waiters:
+            self.stats.in_flight += 1
+            return
+        if self.max_wait <= 0:
+            self.stats.rejected += 1
+            raise HashingOverloadedError(self.retry_after)
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # A released slot is handed over directly, so in_flight is unchanged
+            await asyncio.wait_for(waiter, self.max_wait)
+        except asyncio.TimeoutError:
+            # The slot may be handed over just as the timeout fires (Python 3.12+
+            # still raises then); it is ours, so keep it rather than leak it
+            if waiter.done() and not waiter.cancelled():
+                return
+            self.stats.rejected += 1
+            raise HashingOverloadedError(self.retry_after)
+        except asyncio.CancelledError:
+            # Cancelled after a slot was already handed over: give it back
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _release_slot(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.stats.in_flight -= 1
+
+    async def run(self, func, *args):
+        """Run ``func(*args)`` in the pool and record queue depth and latency."""
+        await self._acquire_slot()
+        loop = asyncio.get_running_loop()
+        self.stats.submitted += 1
+        start = time.perf_counter()
+        try:
+            result = await loop.run_in_executor(self._get_executor(), func, *args)
+        except BrokenProcessPool:
+            # A worker died; drop the pool so the next call starts a fresh one
+            logger.error("Password hashing pool broken, recreating")
+            self.stats.failed += 1
+            self._executor = None
+            raise
+        except Exception:
+            self.stats.failed += 1
+            raise
+        else:
+            self.stats.completed += 1
+            return result
+        finally:
+            latency = time.perf_counter() - start
+            self._release_slot()
+            self.stats.total_latency += latency
+            self.stats.max_latency = max(self.stats.max_latency, latency)
+
+    def snapshot(self) -> dict:
+        """Return current pool metrics for monitoring."""
+        finished = self.stats.completed + self.stats.failed
+        return {
+            "workers": self.workers,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.stats.in_flight,
+            "waiting": len(self._waiters),
+            "queue_depth": max(0, self.stats.in_flight - self.workers)
+            + len(self._waiters),
+            "submitted": self.stats.submitted,
+            "completed": self.stats.completed,
+            "failed": self.stats.failed,
+            "rejected": self.stats.rejected,
+            "avg_latency_ms": (
+                round(self.stats.total_latency / finished * 1000, 3)
+                if finished
+                else 0.0
+            ),
+            "max_latency_ms": round(self.stats.max_latency * 1000, 3),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_in_flight=settings.PASSWORD_HASH_MAX_IN_FLIGHT,
+    max_wait=settings.PASSWORD_HASH_MAX_WAIT_SECONDS,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER_SECONDS,
+)
+
+
+async def hash_password(password: str) -> str:
+    """Hash a password without blocking the event loop."""
+    # Pass the cost explicitly: workers may predate a calibration in this process
+    return await hasher.run(
+        security.get_password_hash, password, security.get_bcrypt_rounds()
+    )
+
+
+async def hash_passwords(
+    passwords: list[str], chunk_size: int, concurrency: int = 0
+) -> list[str]:
+    """Hash many passwords, ``chunk_size`` per worker task, in input order.
+
+    At most ``concurrency`` chunks (default: half the pool) are in flight, so a
+    bulk job leaves workers, not just admission slots, free for logins.
+    """
+    rounds = security.get_bcrypt_rounds()
+    limit = asyncio.Semaphore(concurrency or max(1, hasher.workers // 2))
+
+    async def run(chunk: list[str]) -> list[str]:
+        async with limit:
+            return await hasher.run(security.hash_passwords, chunk, rounds)
+
+    chunks = [
+        passwords[i : i + chunk_size] for i in range(0, len(passwords), chunk_size)
+    ]
+    hashed = await asyncio.gather(*(run(chunk) for chunk in chunks))
+    return [h for chunk in hashed for h in chunk]
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash without blocking the event loop."""
+    return await hasher.run(security.verify_password, plain_password, hashed_password)
+
+
+async def calibrate_bcrypt_cost() -> int:
+    """Benchmark bcrypt on a pool worker and adopt the cost that fits the budget."""
+    rounds, elapsed_ms = await hasher.run(
+        security.calibrate_bcrypt_rounds,
+        settings.BCRYPT_TARGET_MS,
+        settings.BCRYPT_MIN_ROUNDS,
+        settings.BCRYPT_MAX_ROUNDS,
+    )
+    security.set_bcrypt_rounds(rounds)
+    logger.info(
+        f"Calibrated bcrypt cost: {rounds} rounds at {elapsed_ms:.1f}ms "
+        f"(target {settings.BCRYPT_TARGET_MS}ms)"
+    )
+    return rounds
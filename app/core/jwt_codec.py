@@ -0,0 +1,183 @@
+"""
+Specialized JWT codec for the tokens this service issues.
+Each codec is bound to one key: the header segment is serialized once, the
+HMAC key schedule or parsed asymmetric key is reused for every token, and
+decoding only validates the registered claims we rely on (``exp``, ``nbf``).
+Errors are raised as python-jose exceptions so callers are unaffected.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import Optional
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, padding
+from cryptography.hazmat.primitives.asymmetric.utils import (
+    decode_dss_signature,
+    encode_dss_signature,
+)
+from jose.exceptions import ExpiredSignatureError, JWTClaimsError, JWTError
+
+_HMAC_DIGESTS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+_EC_HASHES = {"ES256": (hashes.SHA256, 32), "ES384": (hashes.SHA384, 48)}
+_RSA_HASHES = {"RS256": hashes.SHA256, "RS384": hashes.SHA384, "RS512": hashes.SHA512}
+
+SUPPORTED_ALGORITHMS = (
+    set(_HMAC_DIGESTS) | set(_EC_HASHES) | set(_RSA_HASHES) | {"EdDSA"}
+)
+
+
+def b64url_encode(raw: bytes) -> bytes:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=")
+
+
+def b64url_decode(segment: str) -> bytes:
+    try:
+        return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+    except (ValueError, TypeError):
+        raise JWTError("Invalid token segment")
+
+
+def header_segment(algorithm: str, kid: Optional[str]) -> str:
+    header = {"alg": algorithm, "typ": "JWT"}
+    if kid is not None:
+        header["kid"] = kid
+    return b64url_encode(json.dumps(header, separators=(",", ":")).encode()).decode()
+
+
+class JWTCodec:
+    """Encode and verify compact JWS tokens for a single key."""
+
+    def __init__(
+        self,
+        algorithm: str,
+        kid: Optional[str] = None,
+        secret: str = "",
+        private_key: str = "",
+        public_key: str = "",
+    ):
+        if algorithm not in SUPPORTED_ALGORITHMS:
+            raise ValueError(f"Unsupported JWT algorithm {algorithm}")
+        self.algorithm = algorithm
+        self.header = header_segment(algorithm, kid)
+        self._header_prefix = self.header.encode() + b"."
+        self._mac = None
+        self._private = None
+        self._public = None
+        if algorithm in _HMAC_DIGESTS:
+            self._mac = hmac.new(secret.encode(), digestmod=_HMAC_DIGESTS[algorithm])
+            return
+        if private_key:
+            self._private = serialization.load_pem_private_key(
+                private_key.encode(), password=None
+            )
+            self._public = self._private.public_key()
+        if public_key:
+            self._public = serialization.load_pem_public_key(public_key.encode())
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        if self._mac is not None:
+            mac = self._mac.copy()
+            mac.update(signing_input)
+            return mac.digest()
+        if self._private is None:
+            raise ValueError("Key has no private part and cannot sign")
+        if self.algorithm == "EdDSA":
+            return self._private.sign(signing_input)
+        if self.algorithm in _EC_HASHES:
+            hash_cls, size = _EC_HASHES[self.algorithm]
+            der = self._private.sign(signing_input, ec.ECDSA(hash_cls()))
+            r, s = decode_dss_signature(der)
+            return r.to_bytes(size, "big") + s.to_bytes(size, "big")
+        return self._private.sign(
+            signing_input, padding.PKCS1v15(), _RSA_HASHES[self.algorithm]()
+        )
+
+    def _verify(self, signing_input: bytes, signature: bytes) -> bool:
+        if self._mac is not None:
+            mac = self._mac.copy()
+            mac.update(signing_input)
+            return hmac.compare_digest(mac.digest(), signature)
+        try:
+            if self.algorithm == "EdDSA":
+                self._public.verify(signature, signing_input)
+            elif self.algorithm in _EC_HASHES:
+                hash_cls, size = _EC_HASHES[self.algorithm]
+                if len(signature) != 2 * size:
+                    return False
+                der = encode_dss_signature(
+                    int.from_bytes(signature[:size], "big"),
+                    int.from_bytes(signature[size:], "big"),
+                )
+                self._public.verify(der, signing_input, ec.ECDSA(hash_cls()))
+            else:
+                self._public.verify(
+                    signature,
+                    signing_input,
+                    padding.PKCS1v15(),
+                    _RSA_HASHES[self.algorithm](),
+                )
+        except InvalidSignature:
+            return False
+        return True
+
+    def encode(self, claims: dict) -> str:
+        payload = b64url_encode(json.dumps(claims, separators=(",", ":")).encode())
+        signing_input = self._header_prefix + payload
+        return (
+            signing_input + b"." + b64url_encode(self._sign(signing_input))
+        ).decode()
+
+    def decode(self, token: str) -> dict:
+        """Verify ``token`` (already matched to this key) and return its claims."""
+        try:
+            signing_input, signature = token.rsplit(".", 1)
+            _, payload_segment = signing_input.split(".")
+        except ValueError:
+            raise JWTError("Not enough segments")
+        if not self._verify(signing_input.encode(), b64url_decode(signature)):
+            raise JWTError("Signature verification failed.")
+        try:
+            claims = json.loads(b64url_decode(payload_segment))
+        except ValueError:
+            raise JWTError("Invalid payload string")
+        if not isinstance(claims, dict):
+            raise JWTError("Invalid payload string: must be a json object")
+        validate_claims(claims)
+        return claims
+
+
+def validate_claims(claims: dict) -> None:
+    """Every token we accept must expire; ``nbf`` is honoured when present."""
+    now = time.time()
+    exp = claims.get("exp")
+    if not isinstance(exp, (int, float)):
+        raise JWTClaimsError("Expiration Time claim (exp) is required.")
+    if exp < now:
+        raise ExpiredSignatureError("Signature has expired.")
+    nbf = claims.get("nbf")
+    if nbf is not None:
+        if not isinstance(nbf, (int, float)):
+            raise JWTClaimsError("Not Before claim (nbf) must be an integer.")
+        if nbf > now:
+            raise JWTClaimsError("The token is not yet valid (nbf)")
+
+
+def read_header(token: str) -> dict:
+    """Parse the (unverified) header of a compact token."""
+    segment = token.split(".", 1)[0]
+    try:
+        header = json.loads(b64url_decode(segment))
+    except ValueError:
+        raise JWTError("Error decoding token headers.")
+    if not isinstance(header, dict):
+        raise JWTError("Invalid header string: must be a json object")
+    return header
@@ -0,0 +1,234 @@
+"""
+JWT signing keyring.
+Tokens are signed with the current signing key and carry its ``kid`` in the
+header; verification looks the key up by ``kid`` in a dict. Keys can be
+scheduled (``active_from``) and retired (``retire_at``), so a rotation only
+changes which key signs new tokens and never invalidates tokens in flight.
+Asymmetric keys are also published as a JWKS so other services can verify
+tokens without calling us.
+"""
+
+import base64
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import cached_property
+from typing import Optional
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from jose import JWTError
+
+from app.core.config import settings
+from app.core.jwt_codec import JWTCodec, header_segment, read_header
+
+# Tokens issued before kid headers existed are verified with the key of this kid:
+# SECRET_KEY when JWT_KEYS is empty, otherwise only an explicit (retirable) entry
+LEGACY_KID = "default"
+
+_CURVES = {"secp256r1": "P-256", "secp384r1": "P-384", "secp521r1": "P-521"}
+
+
+def _b64url(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64url_uint(value: int, length: Optional[int] = None) -> str:
+    return _b64url(value.to_bytes(length or (value.bit_length() + 7) // 8, "big"))
+
+
+@dataclass(frozen=True)
+class JWTKey:
+    kid: str
+    algorithm: str
+    secret: str = ""
+    private_key: str = ""
+    public_key: str = ""
+    active_from: Optional[datetime] = None
+    retire_at: Optional[datetime] = None
+
+    def __post_init__(self):
+        # An empty HMAC secret would let anyone forge tokens for this kid
+        if self.is_symmetric and not self.secret:
+            raise ValueError(f"JWT key {self.kid!r} ({self.algorithm}) has no secret")
+        if not self.is_symmetric and not (self.private_key or self.public_key):
+            raise ValueError(
+                f"JWT key {self.kid!r} ({self.algorithm}) has no public or private key"
+            )
+
+    @property
+    def is_symmetric(self) -> bool:
+        return self.algorithm.startswith("HS")
+
+    @property
+    def can_sign(self) -> bool:
+        return bool(self.secret if self.is_symmetric else self.private_key)
+
+    @cached_property
+    def codec(self) -> JWTCodec:
+        return JWTCodec(
+            self.algorithm,
+            kid=self.kid,
+            secret=self.secret,
+            private_key=self.private_key,
+            public_key=self.public_key,
+        )
+
+    def _public_key_object(self):
+        if self.public_key:
+            return serialization.load_pem_public_key(self.public_key.encode())
+        private = serialization.load_pem_private_key(
+            self.private_key.encode(), password=None
+        )
+        return private.public_key()
+
+    def public_jwk(self) -> Optional[dict]:
+        """RFC 7517 public JWK, or None for shared-secret keys."""
+        if self.is_symmetric:
+            return None
+        jwk = {"kid": self.kid, "alg": self.algorithm, "use": "sig"}
+        public = self._public_key_object()
+        if isinstance(public, ec.EllipticCurvePublicKey):
+            numbers = public.public_numbers()
+            size = (public.curve.key_size + 7) // 8
+            jwk.update(
+                kty="EC",
+                crv=_CURVES[public.curve.name],
+                x=_b64url_uint(numbers.x, size),
+                y=_b64url_uint(numbers.y, size),
+            )
+        elif isinstance(public, rsa.RSAPublicKey):
+            numbers = public.public_numbers()
+            jwk.update(kty="RSA", n=_b64url_uint(numbers.n), e=_b64url_uint(numbers.e))
+        elif isinstance(public, ed25519.Ed25519PublicKey):
+            raw = public.public_bytes(
+                serialization.Encoding.Raw, serialization.PublicFormat.Raw
+            )
+            jwk.update(kty="OKP", crv="Ed25519", x=_b64url(raw))
+        else:
+            raise ValueError(f"Unsupported public key type for kid {self.kid}")
+        return jwk
+
+    def is_retired(self, now: datetime) -> bool:
+        return self.retire_at is not None and self.retire_at <= now
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _read_pem(entry: dict, field: str) -> str:
+    """Inline PEM from ``field`` or the contents of ``<field>_file``."""
+    if entry.get(field):
+        return entry[field]
+    path = entry.get(f"{field}_file")
+    if not path:
+        return ""
+    with open(path) as f:
+        return f.read()
+
+
+class Keyring:
+    """Verification keys indexed by kid, plus time-based signing key selection."""
+
+    def __init__(self, keys: list[JWTKey]):
+        if not keys:
+            raise ValueError("Keyring needs at least one key")
+        self._by_kid = {key.kid: key for key in keys}
+        # Tokens we issue share one header per key, so it identifies the key
+        self._by_header = {header_segment(k.algorithm, k.kid): k for k in keys}
+        epoch = datetime.min.replace(tzinfo=timezone.utc)
+        # Newest scheduled key first, so signing picks the latest active one
+        self._signing_order = sorted(
+            (k for k in keys if k.can_sign),
+            key=lambda k: k.active_from or epoch,
+            reverse=True,
+        )
+        self._jwks: dict[tuple, tuple[bytes, str]] = {}
+
+    @classmethod
+    def from_settings(cls) -> "Keyring":
+        """Build from JWT_KEYS (JSON list) or fall back to SECRET_KEY/ALGORITHM."""
+        if not settings.JWT_KEYS:
+            return cls([JWTKey(LEGACY_KID, settings.ALGORITHM, settings.SECRET_KEY)])
+        keys = [
+            JWTKey(
+                kid=entry["kid"],
+                algorithm=entry.get("algorithm", settings.ALGORITHM),
+                secret=entry.get("secret", ""),
+                private_key=_read_pem(entry, "private_key"),
+                public_key=_read_pem(entry, "public_key"),
+                active_from=_parse_time(entry.get("active_from")),
+                retire_at=_parse_time(entry.get("retire_at")),
+            )
+            for entry in json.loads(settings.JWT_KEYS)
+        ]
+        return cls(keys)
+
+    def signing_key(self, now: Optional[datetime] = None) -> JWTKey:
+        now = now or datetime.now(timezone.utc)
+        for key in self._signing_order:
+            started = key.active_from is None or key.active_from <= now
+            if started and not key.is_retired(now):
+                return key
+        raise ValueError("No active signing key")
+
+    def verification_key(
+        self, kid: Optional[str], now: Optional[datetime] = None
+    ) -> Optional[JWTKey]:
+        if kid is not None and not isinstance(kid, str):
+            raise JWTError("Invalid kid header")
+        key = self._by_kid.get(kid or LEGACY_KID)
+        if key is None or key.is_retired(now or datetime.now(timezone.utc)):
+            return None
+        return key
+
+    def key_for_token(
+        self, token: str, now: Optional[datetime] = None
+    ) -> Optional[JWTKey]:
+        """Verification key for ``token``, or None if unknown or retired.
+
+        Tokens we issued are matched on their raw header segment; anything
+        else has its header parsed and must name the key's own algorithm.
+        """
+        key = self._by_header.get(token.partition(".")[0])
+        if key is None:
+            header = read_header(token)
+            key = self.verification_key(header.get("kid"), now)
+            if key is None or header.get("alg") != key.algorithm:
+                return None
+            return key
+        if key.is_retired(now or datetime.now(timezone.utc)):
+            return None
+        return key
+
+    def jwks(self, now: Optional[datetime] = None) -> tuple[bytes, str]:
+        """Serialized JWKS of unretired public keys and its ETag.
+
+        Scheduled keys are published before they start signing, so verifiers
+        already hold them when the first token arrives.
+        """
+        now = now or datetime.now(timezone.utc)
+        live = tuple(
+            k.kid
+            for k in self._by_kid.values()
+            if not k.is_symmetric and not k.is_retired(now)
+        )
+        if live not in self._jwks:
+            keys = [self._by_kid[kid].public_jwk() for kid in live]
+            body = json.dumps({"keys": keys}, separators=(",", ":")).encode()
+            etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+            self._jwks = {live: (body, etag)}
+        return self._jwks[live]
+
+    def kids(self) -> list[str]:
+        return list(self._by_kid)
+
+
+keyring = Keyring.from_settings()
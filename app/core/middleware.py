@@ -99,3 +99,25 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
         response.headers["X-Request-ID"] = request_id
 
         return response
+
+
+class ReadYourWritesMiddleware(BaseHTTPMiddleware):
+    """Pin clients to the primary database for a while after they write."""
+
+    SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        if (
+            settings.DATABASE_REPLICA_URLS
+            and request.method not in self.SAFE_METHODS
+            and response.status_code < 400
+        ):
+            response.set_cookie(
+                "read_primary",
+                "1",
+                max_age=settings.READ_YOUR_WRITES_SECONDS,
+                httponly=True,
+                samesite="lax",
+            )
+        return response
@@ -0,0 +1,93 @@
+"""
+In-process index of revoked token ids.
+Revoked ``jti`` values are kept in Bloom filters grouped by the token's expiry
+bucket, so a lookup only probes the bucket the presented token could be in and
+whole buckets are dropped once every token in them has expired. A negative
+answer is definitive; a positive one must be confirmed against the database.
+"""
+
+import hashlib
+import math
+import time
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key)
+        )
+
+
+class RevocationIndex:
+    """Revoked jti values bucketed by expiry, each bucket a chain of Bloom filters."""
+
+    def __init__(self, bucket_seconds: int, capacity: int, error_rate: float):
+        self.bucket_seconds = max(1, bucket_seconds)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.lookups = 0
+        self.positives = 0
+        self._buckets: dict[int, list[BloomFilter]] = {}
+
+    def _bucket(self, exp: float) -> int:
+        return int(exp // self.bucket_seconds)
+
+    def add(self, jti: str, exp: float) -> None:
+        if exp <= time.time():
+            return  # Expired tokens are rejected by signature validation anyway
+        filters = self._buckets.setdefault(self._bucket(exp), [])
+        if not filters or filters[-1].count >= self.capacity:
+            filters.append(BloomFilter(self.capacity, self.error_rate))
+        filters[-1].add(jti)
+
+    def might_contain(self, jti: str, exp: float) -> bool:
+        self.lookups += 1
+        filters = self._buckets.get(self._bucket(exp))
+        if filters and any(jti in f for f in filters):
+            self.positives += 1
+            return True
+        return False
+
+    def expire(self) -> None:
+        """Drop buckets whose tokens have all expired."""
+        current = self._bucket(time.time())
+        for bucket in [b for b in self._buckets if b < current]:
+            del self._buckets[bucket]
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+    def stats(self) -> dict:
+        filters = [f for chain in self._buckets.values() for f in chain]
+        entries = sum(f.count for f in filters)
+        size = sum(len(f.bits) for f in filters)
+        return {
+            "buckets": len(self._buckets),
+            "entries": entries,
+            "bytes": size,
+            "bytes_per_entry": round(size / entries, 2) if entries else 0.0,
+            "lookups": self.lookups,
+            "positives": self.positives,
+        }
@@ -1,43 +1,196 @@
+import hashlib
+import math
+import re
+import time
 import uuid
-from datetime import datetime, timedelta
+from datetime import timedelta
+from functools import lru_cache
 
-from jose import jwt
+from jose import JWTError
 from passlib.context import CryptContext
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.keys import keyring
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Verified token payloads keyed by token digest, so repeat bearers skip decoding
+_decoded_tokens = TTLCache(
+    maxsize=settings.DECODED_TOKEN_CACHE_SIZE,
+    ttl=settings.DECODED_TOKEN_CACHE_TTL_SECONDS,
+)
 
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+)
 
-def get_password_hash(password: str) -> str:
+
+@lru_cache(maxsize=None)
+def _bcrypt_with_rounds(rounds: int):
+    return pwd_context.handler("bcrypt").using(rounds=rounds)
+
+
+def get_password_hash(password: str, rounds: int | None = None) -> str:
+    if rounds is not None:
+        return _bcrypt_with_rounds(rounds).hash(password)
     return pwd_context.hash(password)
 
 
+def hash_passwords(passwords: list[str], rounds: int) -> list[str]:
+    """Hash a batch in one call so pool workers pay the IPC cost once per batch."""
+    handler = _bcrypt_with_rounds(rounds)
+    return [handler.hash(password) for password in passwords]
+
+
+def is_supported_hash(hashed_password: str) -> bool:
+    """Whether a pre-computed hash is in a format ``verify_password`` accepts."""
+    try:
+        scheme = pwd_context.identify(hashed_password, required=False)
+        if scheme is None:
+            return False
+        pwd_context.handler(scheme).from_string(hashed_password)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
-def create_access_token(subject: str, expires_delta: timedelta | None = None) -> str:
+def password_complexity_errors(password: str) -> list[str]:
+    """Reasons ``password`` is too weak; empty if it is acceptable"""
+    errors = []
+    if len(password) < 8:
+        errors.append("Password must be at least 8 characters long.")
+    if not re.search(r"[A-Z]", password):
+        errors.append("Password must contain at least one uppercase letter.")
+    if not re.search(r"[a-z]", password):
+        errors.append("Password must contain at least one lowercase letter.")
+    if not re.search(r"[0-9]", password):
+        errors.append("Password must contain at least one digit.")
+    if not re.search(r"[!@#$%^&*(),.?\":{}|<>]", password):
+        errors.append("Password must contain at least one special character.")
+    return errors
+
+
+def get_bcrypt_rounds() -> int:
+    return pwd_context.handler("bcrypt").default_rounds
+
+
+def set_bcrypt_rounds(rounds: int) -> None:
+    """Use ``rounds`` for new hashes and flag weaker stored hashes for upgrade."""
+    pwd_context.update(bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds)
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    return pwd_context.needs_update(hashed_password)
+
+
+def _time_hash(rounds: int, samples: int = 3) -> float:
+    """Best-of-N wall time in seconds for one bcrypt hash at ``rounds``."""
+    handler = _bcrypt_with_rounds(rounds)
+    best = float("inf")
+    for _ in range(samples):
+        start = time.perf_counter()
+        handler.hash("calibration-password")
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def calibrate_bcrypt_rounds(
+    target_ms: int, min_rounds: int = 4, max_rounds: int = 31
+) -> tuple[int, float]:
+    """Pick the highest bcrypt cost whose hash time fits within ``target_ms``.
+
+    Each extra round doubles the work, so the cost is extrapolated from a
+    cheap measurement and then confirmed. Returns ``(rounds, measured_ms)``.
+    """
+    base = _time_hash(min_rounds)
+    target = target_ms / 1000
+    extra = int(math.log2(target / base)) if base < target else 0
+    rounds = max(min_rounds, min(max_rounds, min_rounds + extra))
+    elapsed = _time_hash(rounds, samples=1)
+    while rounds > min_rounds and elapsed > target:
+        rounds -= 1
+        elapsed = _time_hash(rounds, samples=1)
+    return rounds, elapsed * 1000
+
+
+def create_access_token(
+    subject: str,
+    expires_delta: timedelta | None = None,
+    claims: dict | None = None,
+    token_version: int = 0,
+) -> str:
     if expires_delta is None:
         expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode = {
+        **(claims or {}),
         "sub": str(subject),
-        "exp": datetime.utcnow() + expires_delta,
+        "exp": int(time.time() + expires_delta.total_seconds()),
         "jti": str(uuid.uuid4()),
+        "ver": token_version,
+        "type": "access",
     }
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return _encode(to_encode)
 
 
-def create_refresh_token(subject: str, expires_delta: timedelta | None = None) -> str:
+def create_refresh_token(
+    subject: str,
+    expires_delta: timedelta | None = None,
+    token_version: int = 0,
+    jti: str | None = None,
+) -> str:
     if expires_delta is None:
         expires_delta = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode = {
         "sub": str(subject),
-        "exp": datetime.utcnow() + expires_delta,
-        "jti": str(uuid.uuid4()),
+        "exp": int(time.time() + expires_delta.total_seconds()),
+        "jti": jti or str(uuid.uuid4()),
+        "ver": token_version,
+        "type": "refresh",
     }
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return _encode(to_encode)
+
+
+def _encode(claims: dict) -> str:
+    return keyring.signing_key().codec.encode(claims)
 
 
 def decode_token(token: str) -> dict:
-    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    """Verify with the key named by the token's ``kid`` header.
+
+    The algorithm comes from the keyring, never from the token, so a token
+    cannot downgrade an asymmetric key to HMAC.
+    """
+    key = keyring.key_for_token(token)
+    if key is None:
+        raise JWTError("Unknown or retired signing key")
+    return key.codec.decode(token)
+
+
+def decode_token_cached(token: str) -> dict:
+    """``decode_token`` memoized until the token's ``exp``.
+
+    Only successful decodes are cached. Callers must still apply revocation and
+    token version checks, and must not mutate the returned payload.
+    """
+    key = token_digest(token)
+    payload = _decoded_tokens.get(key)
+    if payload is None:
+        payload = decode_token(token)
+        if "exp" in payload:
+            _decoded_tokens.set(key, payload, expires_at=payload["exp"])
+    return payload
+
+
+def decoded_token_cache_stats() -> dict:
+    return _decoded_tokens.stats()
+
+
+def token_digest(token: str) -> str:
+    """SHA-256 hex digest used to store or index tokens without keeping them."""
+    return hashlib.sha256(token.encode()).hexdigest()
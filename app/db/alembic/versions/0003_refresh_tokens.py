@@ -0,0 +1,44 @@
+"""add refresh token store
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "refreshtoken",
+        sa.Column("jti", sa.String(), nullable=False),
+        sa.Column("family_id", sa.Uuid(), nullable=False),
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("token_hash", sa.String(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("rotated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("revoked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("jti"),
+    )
+    op.create_index("ix_refreshtoken_family_id", "refreshtoken", ["family_id"])
+    op.create_index("ix_refreshtoken_user_id", "refreshtoken", ["user_id"])
+    op.create_index("ix_refreshtoken_expires_at", "refreshtoken", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_refreshtoken_expires_at", table_name="refreshtoken")
+    op.drop_index("ix_refreshtoken_user_id", table_name="refreshtoken")
+    op.drop_index("ix_refreshtoken_family_id", table_name="refreshtoken")
+    op.drop_table("refreshtoken")
@@ -0,0 +1,36 @@
+"""add revoked access token table
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "revokedtoken",
+        sa.Column("jti", sa.String(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("revoked_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("jti"),
+    )
+    op.create_index("ix_revokedtoken_expires_at", "revokedtoken", ["expires_at"])
+    op.create_index("ix_revokedtoken_revoked_at", "revokedtoken", ["revoked_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_revokedtoken_revoked_at", table_name="revokedtoken")
+    op.drop_index("ix_revokedtoken_expires_at", table_name="revokedtoken")
+    op.drop_table("revokedtoken")
@@ -0,0 +1,101 @@
+"""move email verification tokens to a hashed, expiring table
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16 12:00:00.000000
+
+Outstanding raw tokens of unverified users are carried over as digests with a
+fresh EMAIL_VERIFICATION_EXPIRE_HOURS expiry, so links already mailed keep
+working. A downgrade cannot restore the raw tokens; those users can request a
+new link through POST /auth/resend-verification.
+"""
+
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.core.config import settings
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _backfill(tokens: sa.Table) -> None:
+    hours = int(settings.EMAIL_VERIFICATION_EXPIRE_HOURS)
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "INSERT INTO emailverificationtoken "
+            "(token_hash, user_id, expires_at, created_at) "
+            "SELECT encode(sha256(convert_to(email_verification_token, 'UTF8')), "
+            f"'hex'), id, now() + interval '{hours} hours', now() FROM \"user\" "
+            "WHERE email_verification_token IS NOT NULL AND NOT email_verified"
+        )
+        return
+    user = sa.table(
+        "user",
+        sa.column("id", sa.Uuid()),
+        sa.column("email_verified", sa.Boolean()),
+        sa.column("email_verification_token", sa.String()),
+    )
+    rows = op.get_bind().execute(
+        sa.select(user.c.id, user.c.email_verification_token).where(
+            user.c.email_verification_token.is_not(None),
+            sa.not_(user.c.email_verified),
+        )
+    )
+    now = datetime.now(timezone.utc)
+    values = [
+        {
+            # Same digest as app.core.security.token_digest
+            "token_hash": hashlib.sha256(token.encode()).hexdigest(),
+            "user_id": user_id,
+            "expires_at": now + timedelta(hours=hours),
+            "created_at": now,
+        }
+        for user_id, token in rows
+    ]
+    if values:
+        op.bulk_insert(tokens, values)
+
+
+def upgrade() -> None:
+    tokens = op.create_table(
+        "emailverificationtoken",
+        sa.Column("token_hash", sa.String(), nullable=False),
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("token_hash"),
+    )
+    op.create_index(
+        "ix_emailverificationtoken_user_id", "emailverificationtoken", ["user_id"]
+    )
+    op.create_index(
+        "ix_emailverificationtoken_expires_at",
+        "emailverificationtoken",
+        ["expires_at"],
+    )
+    _backfill(tokens)
+    with op.batch_alter_table("user") as batch_op:
+        batch_op.drop_column("email_verification_token")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("user") as batch_op:
+        batch_op.add_column(
+            sa.Column("email_verification_token", sa.String(), nullable=True)
+        )
+    op.drop_index(
+        "ix_emailverificationtoken_expires_at", table_name="emailverificationtoken"
+    )
+    op.drop_index(
+        "ix_emailverificationtoken_user_id", table_name="emailverificationtoken"
+    )
+    op.drop_table("emailverificationtoken")
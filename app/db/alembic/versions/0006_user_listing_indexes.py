@@ -0,0 +1,29 @@
+"""add keyset pagination indexes on user
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_user_created_at_id", "user", ["created_at", "id"])
+    op.create_index(
+        "ix_user_is_active_created_at_id", "user", ["is_active", "created_at", "id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_is_active_created_at_id", table_name="user")
+    op.drop_index("ix_user_created_at_id", table_name="user")
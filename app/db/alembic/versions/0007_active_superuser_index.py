@@ -0,0 +1,32 @@
+"""add partial index on active superusers
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_user_active_superuser",
+        "user",
+        ["id"],
+        postgresql_where=sa.text("is_superuser AND is_active"),
+        sqlite_where=sa.text("is_superuser AND is_active"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_active_superuser", table_name="user")
@@ -0,0 +1,57 @@
+"""add case-insensitive email key to user
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-16 12:00:00.000000
+
+The column is added empty, its unique index is built (concurrently on
+PostgreSQL) and existing rows are then backfilled in autocommitted batches, so
+no step holds a long lock on the user table. Rows written by instances still on
+the previous release are picked up by ``python -m app.cli backfill-email-keys``.
+"""
+
+import logging
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.db.email_keys import backfill_email_keys
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def upgrade() -> None:
+    op.add_column("user", sa.Column("email_normalized", sa.String(), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_user_email_normalized",
+            "user",
+            ["email_normalized"],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+        updated, duplicates = backfill_email_keys(op.get_bind())
+    logger.info(f"Backfilled email_normalized for {updated} users")
+    if duplicates:
+        logger.warning(
+            f"{len(duplicates)} users share an email with another account up to "
+            f"case and were left without a key: {', '.join(duplicates[:20])}"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_user_email_normalized",
+            table_name="user",
+            postgresql_concurrently=True,
+        )
+    with op.batch_alter_table("user") as batch_op:
+        batch_op.drop_column("email_normalized")
@@ -0,0 +1,98 @@
+"""move lockout state to loginlockout and cover the login lookup
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-16 12:00:00.000000
+
+Expand step: lockout counters are copied into the narrow loginlockout table and
+the unique email key index is rebuilt (concurrently on PostgreSQL) as
+ix_user_login, which INCLUDEs every column a login reads so the lookup can be
+an index-only scan. user.failed_attempts and user.locked_until stay, with a
+server default so the new release can insert users without them; they are
+dropped by 0010 once no instance of the previous release is running.
+
+While both releases serve logins, each counts failures in its own place (the
+previous one on user, the new one in loginlockout) and ignores the other's
+locks, so an account can take up to twice MAX_LOGIN_ATTEMPTS guesses per lock
+period. Keep that rollout short.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LOGIN_COLUMNS = [
+    "id",
+    "email",
+    "hashed_password",
+    "is_active",
+    "is_superuser",
+    "email_verified",
+    "token_version",
+    "created_at",
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "loginlockout",
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("failed_attempts", sa.Integer(), nullable=False),
+        sa.Column("locked_until", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    # User timestamps are naive UTC
+    if op.get_bind().dialect.name == "postgresql":
+        locked_until = "locked_until AT TIME ZONE 'UTC'"
+    else:
+        locked_until = "locked_until"
+    op.execute(
+        "INSERT INTO loginlockout (user_id, failed_attempts, locked_until, updated_at) "
+        f'SELECT id, failed_attempts, {locked_until}, CURRENT_TIMESTAMP FROM "user" '
+        "WHERE failed_attempts > 0 OR locked_until IS NOT NULL"
+    )
+    with op.batch_alter_table("user") as batch_op:
+        batch_op.alter_column(
+            "failed_attempts", existing_type=sa.Integer(), server_default="0"
+        )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_user_login",
+            "user",
+            ["email_normalized"],
+            unique=True,
+            postgresql_include=LOGIN_COLUMNS,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_user_email_normalized",
+            table_name="user",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_user_email_normalized",
+            "user",
+            ["email_normalized"],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+        op.drop_index("ix_user_login", table_name="user", postgresql_concurrently=True)
+    with op.batch_alter_table("user") as batch_op:
+        batch_op.alter_column(
+            "failed_attempts", existing_type=sa.Integer(), server_default=None
+        )
+    op.drop_table("loginlockout")
@@ -0,0 +1,37 @@
+"""drop lockout columns from user
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-16 12:00:00.000000
+
+Contract step of 0009: apply once every instance runs a release that keeps
+lockout state in loginlockout. A downgrade restores the columns empty; lockout
+counters stay in loginlockout.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("user") as batch_op:
+        batch_op.drop_column("locked_until")
+        batch_op.drop_column("failed_attempts")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("user") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "failed_attempts", sa.Integer(), nullable=False, server_default="0"
+            )
+        )
+        batch_op.add_column(sa.Column("locked_until", sa.DateTime(), nullable=True))
@@ -0,0 +1,4 @@
+# Metadata used by Alembic; importing the models registers their tables
+from sqlmodel import SQLModel  # noqa: F401
+
+from app.db import models  # noqa: F401
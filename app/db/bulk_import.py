@@ -0,0 +1,234 @@
+"""
+Bulk user import.
+Reads a stream of NDJSON user records, hashes plaintext passwords across the
+hashing pool and inserts users in large batches with a single
+``INSERT ... ON CONFLICT DO NOTHING RETURNING`` per batch. Existing emails
+(compared case-insensitively) are reported as conflicts rather than failing the batch, so a partially
+completed import can simply be re-run. Each batch commits on its own, and the
+insert of one batch overlaps with parsing and hashing of the next.
+Imports over HTTP are bounded (body and line size, plaintext rows) and hash one
+password per pool task, so they cannot hold the pool that serves logins.
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterable, Callable, Optional, Union
+
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.core.emails import normalize_email
+from app.core.hashing import hash_passwords
+from app.core.logging import logger
+from app.core.security import is_supported_hash, password_complexity_errors
+from app.db.crud import dialect_insert, new_user_values
+from app.db.models import User
+from app.schemas.user import UserImport
+
+# Conflicting emails and per-line errors listed in a report (counts are exact)
+MAX_REPORTED = 100
+
+
+class ImportLimitError(ValueError):
+    """The import stream exceeded a size limit; batches before it are committed."""
+
+
+@dataclass
+class ImportReport:
+    received: int = 0
+    inserted: int = 0
+    conflicts: int = 0
+    invalid: int = 0
+    batches: int = 0
+    conflicting_emails: list[str] = field(default_factory=list)
+    errors: list[dict] = field(default_factory=list)
+    started: float = field(default_factory=time.perf_counter)
+
+    def conflict(self, email: str) -> None:
+        self.conflicts += 1
+        if len(self.conflicting_emails) < MAX_REPORTED:
+            self.conflicting_emails.append(email)
+
+    def error(self, line: int, message: str) -> None:
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED:
+            self.errors.append({"line": line, "error": message})
+
+    def as_dict(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "received": self.received,
+            "inserted": self.inserted,
+            "conflicts": self.conflicts,
+            "invalid": self.invalid,
+            "batches": self.batches,
+            "conflicting_emails": self.conflicting_emails,
+            "errors": self.errors,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.inserted / elapsed, 1) if elapsed else 0.0,
+        }
+
+
+async def _lines(
+    chunks: AsyncIterable[Union[bytes, str]], max_bytes: int = 0, max_line: int = 0
+):
+    """Split a chunked byte stream into numbered lines, whatever the chunking"""
+    number, pending, received = 0, b"", 0
+    async for chunk in chunks:
+        chunk = chunk.encode() if isinstance(chunk, str) else chunk
+        received += len(chunk)
+        if max_bytes and received > max_bytes:
+            raise ImportLimitError(f"Import body exceeds {max_bytes} bytes")
+        pending += chunk
+        *complete, pending = pending.split(b"\n")
+        for line in complete:
+            number += 1
+            if max_line and len(line) > max_line:
+                raise ImportLimitError(f"Line {number} exceeds {max_line} bytes")
+            yield number, line
+        if max_line and len(pending) > max_line:
+            raise ImportLimitError(f"Line {number + 1} exceeds {max_line} bytes")
+    if pending:
+        yield number + 1, pending
+
+
+def _parse(line: bytes) -> UserImport:
+    record = UserImport.model_validate(json.loads(line))
+    if (record.password is None) == (record.hashed_password is None):
+        raise ValueError("Exactly one of password or hashed_password is required")
+    if record.password is not None:
+        errors = password_complexity_errors(record.password)
+        if errors:
+            raise ValueError(" ".join(errors))
+    if record.hashed_password is not None and not is_supported_hash(
+        record.hashed_password
+    ):
+        raise ValueError("Unsupported password hash format")
+    return record
+
+
+async def _rows(records: list[UserImport], hash_chunk_size: int) -> list[dict]:
+    plaintext = [r for r in records if r.hashed_password is None]
+    hashed = await hash_passwords(
+        [r.password for r in plaintext],
+        hash_chunk_size,
+        settings.BULK_IMPORT_HASH_CONCURRENCY,
+    )
+    digests = {id(r): h for r, h in zip(plaintext, hashed)}
+    return [
+        new_user_values(
+            r.email,
+            r.hashed_password or digests[id(r)],
+            is_active=r.is_active,
+            email_verified=r.email_verified,
+        )
+        for r in records
+    ]
+
+
+async def _insert(session_factory: Callable, rows: list[dict]) -> set[str]:
+    """Insert one batch, skipping existing emails; returns the keys inserted"""
+    async with session_factory() as session:
+        statement = (
+            dialect_insert(session, User.__table__)
+            .on_conflict_do_nothing()
+            .returning(User.__table__.c.email_normalized)
+        )
+        result = await session.execute(statement, rows)
+        inserted = set(result.scalars().all())
+        await session.commit()
+    return inserted
+
+
+async def import_users(
+    session_factory: Callable,
+    chunks: AsyncIterable[Union[bytes, str]],
+    batch_size: int = 0,
+    on_batch: Optional[Callable[[dict], None]] = None,
+    *,
+    max_bytes: int = 0,
+    max_line_bytes: int = 0,
+    max_plaintext: int = 0,
+    hash_chunk_size: int = 0,
+) -> dict:
+    """Import NDJSON users from ``chunks`` and return a throughput report.
+
+    Limits of 0 mean unlimited. Plaintext rows beyond ``max_plaintext`` are
+    reported as errors; exceeding a size limit raises ImportLimitError.
+    """
+    batch_size = batch_size or settings.BULK_IMPORT_BATCH_SIZE
+    hash_chunk_size = hash_chunk_size or settings.BULK_IMPORT_HASH_CHUNK_SIZE
+    report = ImportReport()
+    plaintext = 0
+    # The batch being inserted while the next one is parsed and hashed
+    pending: Optional[tuple[asyncio.Task, dict[str, UserImport]]] = None
+
+    async def finish(task: asyncio.Task, batch: dict[str, UserImport]) -> None:
+        inserted = await task
+        report.inserted += len(inserted)
+        report.batches += 1
+        for key, record in batch.items():
+            if key not in inserted:
+                report.conflict(record.email)
+        if on_batch is not None:
+            on_batch(report.as_dict())
+
+    async def flush(batch: dict[str, UserImport]) -> None:
+        nonlocal pending
+        rows = await _rows(list(batch.values()), hash_chunk_size)
+        if pending is not None:
+            await finish(*pending)
+        pending = (asyncio.create_task(_insert(session_factory, rows)), batch)
+
+    batch: dict[str, UserImport] = {}
+    try:
+        async for number, line in _lines(chunks, max_bytes, max_line_bytes):
+            if not line.strip():
+                continue
+            report.received += 1
+            try:
+                record = _parse(line)
+            except ValidationError as e:
+                first = e.errors()[0]
+                location = ".".join(str(part) for part in first["loc"])
+                report.error(number, f"{location}: {first['msg']}")
+                continue
+            except ValueError as e:
+                # Includes malformed JSON (JSONDecodeError)
+                report.error(number, str(e))
+                continue
+            if record.password is not None:
+                plaintext += 1
+                if max_plaintext and plaintext > max_plaintext:
+                    report.error(
+                        number,
+                        f"Only {max_plaintext} plaintext passwords are hashed per "
+                        "request; send hashed_password or use the import-users CLI",
+                    )
+                    continue
+            key = normalize_email(record.email)
+            if key in batch:
+                report.conflict(record.email)
+                continue
+            batch[key] = record
+            if len(batch) >= batch_size:
+                await flush(batch)
+                batch = {}
+        if batch:
+            await flush(batch)
+        if pending is not None:
+            await finish(*pending)
+            pending = None
+    finally:
+        if pending is not None:
+            pending[0].cancel()
+
+    summary = report.as_dict()
+    logger.info(
+        f"Imported {summary['inserted']} users in {summary['elapsed_seconds']}s "
+        f"({summary['rows_per_second']} rows/s, {summary['conflicts']} conflicts, "
+        f"{summary['invalid']} invalid)"
+    )
+    return summary
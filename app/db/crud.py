@@ -1,11 +1,22 @@
 import uuid
+from datetime import datetime, timezone
 from typing import Optional
 
+from sqlalchemy import and_, literal, or_, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
-from app.core.security import get_password_hash, verify_password
-from app.db.models import User
+from app.core.emails import normalize_email
+from app.core.hashing import HashingOverloadedError, hash_password
+from app.core.security import needs_rehash
+from app.db.models import EmailVerificationToken, User
+from app.db.pagination import decode_cursor, encode_cursor, estimate_count
+from app.db.records import UserSnapshot, record_columns
+from app.db.verification_tokens import new_verification_token
+
+# INSERT constructs that support ON CONFLICT, per dialect
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
 
 
 async def get_user(session: AsyncSession, user_id: str) -> Optional[User]:
@@ -19,45 +30,221 @@ async def get_user(session: AsyncSession, user_id: str) -> Optional[User]:
         return None
 
 
+def email_lookup(statement, email: str):
+    """Restrict ``statement`` to the account for ``email``, ignoring case.
+
+    Rows not yet backfilled with a key still match on the exact address. An
+    exact match wins, so a case duplicate left without a key stays reachable;
+    otherwise the keyed row does.
+    """
+    return (
+        statement.where(
+            or_(
+                User.email_normalized == normalize_email(email),
+                and_(User.email_normalized.is_(None), User.email == email),
+            )
+        )
+        .order_by(User.email != email, User.email_normalized.is_(None))
+        .limit(1)
+    )
+
+
 async def get_user_by_email(session: AsyncSession, email: str) -> Optional[User]:
     """Get user by email"""
-    statement = select(User).where(User.email == email)
-    result = await session.execute(statement)
+    result = await session.execute(email_lookup(select(User), email))
     return result.scalar_one_or_none()
 
 
-async def create_user(session: AsyncSession, email: str, password: str) -> User:
-    """Create a new user"""
-    # Check if user already exists
-    existing_user = await get_user_by_email(session, email)
-    if existing_user:
-        raise ValueError("User with this email already exists")
+def _column_time(value: datetime) -> datetime:
+    """User timestamps are stored as naive UTC"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def user_filters(
+    is_active: Optional[bool] = None,
+    is_superuser: Optional[bool] = None,
+    email_verified: Optional[bool] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+) -> list:
+    """WHERE clauses for listing users; None means no constraint"""
+    clauses = []
+    if is_active is not None:
+        clauses.append(User.is_active == is_active)
+    if is_superuser is not None:
+        clauses.append(User.is_superuser == is_superuser)
+    if email_verified is not None:
+        clauses.append(User.email_verified == email_verified)
+    if created_after is not None:
+        clauses.append(User.created_at >= _column_time(created_after))
+    if created_before is not None:
+        clauses.append(User.created_at < _column_time(created_before))
+    return clauses
+
 
-    # Create new user
-    hashed_password = get_password_hash(password)
-    user = User(
-        id=uuid.uuid4(),
-        email=email,
-        hashed_password=hashed_password,
-        is_active=True,
-        is_superuser=False,
+async def list_users_page(
+    session: AsyncSession, filters: list, limit: int, cursor: Optional[str] = None
+) -> tuple[list[UserSnapshot], Optional[str]]:
+    """One page of users in (created_at, id) order and the cursor of the next page
+
+    Only the listed columns are selected and rows become slotted records, so no
+    ORM instances are built for the page.
+    """
+    statement = select(*record_columns(UserSnapshot)).where(*filters)
+    if cursor:
+        created_at, user_id = decode_cursor(cursor, 2)
+        try:
+            key = (datetime.fromisoformat(created_at), uuid.UUID(user_id))
+        except ValueError:
+            raise ValueError("Invalid cursor")
+        # Cursors we issue carry naive UTC, like the column; an offset is forged
+        if key[0].tzinfo is not None:
+            raise ValueError("Invalid cursor")
+        statement = statement.where(tuple_(User.created_at, User.id) > key)
+    statement = statement.order_by(User.created_at, User.id).limit(limit + 1)
+    users = [UserSnapshot(*row) for row in await session.execute(statement)]
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_cursor(users[-1].created_at.isoformat(), users[-1].id)
+    return users, next_cursor
+
+
+async def list_users_offset(
+    session: AsyncSession, filters: list, limit: int, skip: int
+) -> list[UserSnapshot]:
+    """Legacy offset paging over the same projection"""
+    statement = (
+        select(*record_columns(UserSnapshot))
+        .where(*filters)
+        .order_by(User.created_at, User.id)
+        .offset(skip)
+        .limit(limit)
     )
+    return [UserSnapshot(*row) for row in await session.execute(statement)]
 
-    session.add(user)
-    await session.commit()
-    await session.refresh(user)
+
+async def is_last_active_admin(session: AsyncSession, user: User) -> bool:
+    """Whether removing ``user`` would leave no active superuser.
+
+    The first two active superusers in id order are locked (``FOR UPDATE``), so
+    concurrent demotions queue on the same row and cannot both pass. The
+    partial index on active superusers keeps this at two index entries.
+    """
+    if not (user.is_superuser and user.is_active):
+        return False
+    statement = (
+        select(User.id)
+        .where(User.is_superuser, User.is_active)
+        .order_by(User.id)
+        .limit(2)
+        .with_for_update()
+    )
+    return len((await session.execute(statement)).all()) < 2
+
+
+async def count_users(session: AsyncSession, filters: list) -> int:
+    """Estimated number of users matching ``filters``"""
+    return await estimate_count(session, select(User.id).where(*filters))
+
+
+def dialect_insert(session: AsyncSession, target):
+    """``insert(target)`` for the session's dialect, with ``on_conflict_*``"""
+    return _INSERTS[session.bind.dialect.name](target)
+
+
+def new_user_values(email: str, hashed_password: str, **fields) -> dict:
+    """Every column of a fresh user row, for Core inserts that skip model defaults"""
+    now = _column_time(datetime.now(timezone.utc))
+    values = {
+        "id": uuid.uuid4(),
+        "email": email,
+        "email_normalized": normalize_email(email),
+        "hashed_password": hashed_password,
+        "is_active": True,
+        "is_superuser": False,
+        "email_verified": False,
+        "token_version": 0,
+        "created_at": now,
+        "updated_at": now,
+    }
+    values.update(fields)
+    return values
+
+
+async def create_user(
+    session: AsyncSession, email: str, password: str, **fields
+) -> User:
+    """Create a new user in one INSERT; the caller commits"""
+    hashed_password = await hash_password(password)
+    statement = (
+        dialect_insert(session, User)
+        .values(**new_user_values(email, hashed_password, **fields))
+        .on_conflict_do_nothing()
+        .returning(User)
+    )
+    user = (await session.execute(statement)).scalar_one_or_none()
+    if user is None:
+        raise ValueError("User with this email already exists")
     return user
 
 
-async def authenticate_user(
+async def register_user(
     session: AsyncSession, email: str, password: str
-) -> Optional[User]:
-    """Authenticate user with email and password"""
-    user = await get_user_by_email(session, email)
-    if not user:
-        return None
-    if not user.is_active:
+) -> Optional[tuple[uuid.UUID, str]]:
+    """Create an unverified user and its verification token in one transaction.
+
+    The email is claimed by ``INSERT ... ON CONFLICT DO NOTHING RETURNING`` (on
+    either the address or its normalized key), so concurrent registrations
+    cannot both succeed. On PostgreSQL the user and
+    token rows are written by a single statement. Returns ``(user_id, token)``,
+    or None without writing anything when the email is taken.
+    """
+    hashed_password = await hash_password(password)
+    token, token_values = new_verification_token()
+    new_user = (
+        dialect_insert(session, User.__table__)
+        .values(**new_user_values(email, hashed_password))
+        .on_conflict_do_nothing()
+        .returning(User.__table__.c.id)
+    )
+    if session.bind.dialect.name == "postgresql":
+        created = new_user.cte("new_user")
+        table = EmailVerificationToken.__table__
+        statement = (
+            dialect_insert(session, table)
+            .from_select(
+                ["user_id", *token_values],
+                select(
+                    created.c.id,
+                    *(
+                        literal(value, type_=table.c[name].type)
+                        for name, value in token_values.items()
+                    ),
+                ),
+            )
+            .returning(table.c.user_id)
+        )
+        user_id = (await session.execute(statement)).scalar_one_or_none()
+    else:
+        # SQLite has no data-modifying CTEs: two statements, same transaction
+        user_id = (await session.execute(new_user)).scalar_one_or_none()
+        if user_id is not None:
+            session.add(EmailVerificationToken(user_id=user_id, **token_values))
+    if user_id is None:
+        await session.rollback()
         return None
-    if not verify_password(password, user.hashed_password):
+    await session.commit()
+    return user_id, token
+
+
+async def upgraded_hash(hashed_password: str, password: str) -> Optional[str]:
+    """A hash of ``password`` at the current cost if the stored one is weaker"""
+    if not needs_rehash(hashed_password):
         return None
-    return user
+    try:
+        return await hash_password(password)
+    except HashingOverloadedError:
+        return None  # Retry on a later login rather than failing this one
@@ -0,0 +1,75 @@
+"""
+Backfill of ``user.email_normalized``.
+Walks users without a key in id order, a batch at a time, so it can run against
+a large live table: each batch is one short UPDATE of at most BATCH_SIZE rows
+when the connection is in autocommit mode. Rows whose key is already taken
+(accounts that differ only by case) are left without a key and reported;
+they stay reachable by their exact address (which wins over the other
+account's key) until support merges them.
+Used by migration 0008 and by ``python -m app.cli backfill-email-keys``.
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.engine import Connection
+
+from app.core.emails import normalize_email
+
+BATCH_SIZE = 1000
+
+# Lightweight table clause, so the migration does not depend on the model
+_user = sa.table(
+    "user",
+    sa.column("id", sa.Uuid()),
+    sa.column("email", sa.String()),
+    sa.column("email_normalized", sa.String()),
+)
+
+
+def backfill_email_keys(
+    connection: Connection, batch_size: int = BATCH_SIZE
+) -> tuple[int, list[str]]:
+    """Fill missing keys; returns the rows updated and the emails left as duplicates"""
+    updated, duplicates, last_id = 0, [], None
+    set_key = (
+        _user.update()
+        .where(_user.c.id == sa.bindparam("row_id"))
+        .where(_user.c.email_normalized.is_(None))
+        .values(email_normalized=sa.bindparam("key"))
+    )
+    missing = (
+        sa.select(_user.c.id, _user.c.email)
+        .where(_user.c.email_normalized.is_(None))
+        .order_by(_user.c.id)
+        .limit(batch_size)
+    )
+    while True:
+        statement = missing if last_id is None else missing.where(_user.c.id > last_id)
+        rows = connection.execute(statement).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        keys: dict[str, object] = {}
+        for row in rows:
+            key = normalize_email(row.email)
+            if key in keys:
+                duplicates.append(row.email)
+            else:
+                keys[key] = row
+        taken = set(
+            connection.execute(
+                sa.select(_user.c.email_normalized).where(
+                    _user.c.email_normalized.in_(list(keys))
+                )
+            ).scalars()
+        )
+        params = []
+        for key, row in keys.items():
+            if key in taken:
+                duplicates.append(row.email)
+            else:
+                params.append({"row_id": row.id, "key": key})
+        if params:
+            connection.execute(set_key, params)
+            updated += len(params)
+    return updated, duplicates
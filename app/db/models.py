@@ -2,22 +2,142 @@ import uuid
 from datetime import datetime, timezone
 from typing import Optional
 
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Uuid, event, inspect, text
 from sqlmodel import Field, SQLModel
 
+from app.core.emails import normalize_email
+
 
 def utc_now():
     return datetime.now(timezone.utc)
 
 
 class User(SQLModel, table=True):
+    __table_args__ = (
+        # Keyset pagination order, plus the common "active users" listing
+        Index("ix_user_created_at_id", "created_at", "id"),
+        Index("ix_user_is_active_created_at_id", "is_active", "created_at", "id"),
+        # Only active admins: keeps the last-admin guard at a couple of entries
+        Index(
+            "ix_user_active_superuser",
+            "id",
+            postgresql_where=text("is_superuser AND is_active"),
+            sqlite_where=text("is_superuser AND is_active"),
+        ),
+        # Unique email key carrying everything a login reads, so the lookup can
+        # be an index-only scan (lockout state lives in loginlockout)
+        Index(
+            "ix_user_login",
+            "email_normalized",
+            unique=True,
+            postgresql_include=[
+                "id",
+                "email",
+                "hashed_password",
+                "is_active",
+                "is_superuser",
+                "email_verified",
+                "token_version",
+                "created_at",
+            ],
+        ),
+    )
+
     id: Optional[uuid.UUID] = Field(default=None, primary_key=True)
     email: str = Field(index=True, nullable=False, unique=True)
+    # Case-insensitive lookup key; NULL only on rows awaiting the backfill
+    email_normalized: Optional[str] = None
     hashed_password: str
     is_active: bool = True
     is_superuser: bool = False
-    failed_attempts: int = 0
-    locked_until: Optional[datetime] = None
     email_verified: bool = False
-    email_verification_token: Optional[str] = None
+    token_version: int = 0
     created_at: datetime = Field(default_factory=utc_now)
     updated_at: datetime = Field(default_factory=utc_now)
+
+
+@event.listens_for(User, "before_insert")
+def _set_email_normalized(mapper, connection, user: User) -> None:
+    user.email_normalized = normalize_email(user.email)
+
+
+@event.listens_for(User, "before_update")
+def _update_email_normalized(mapper, connection, user: User) -> None:
+    # Only on an email change: rows left unkeyed as case duplicates must stay so
+    if inspect(user).attrs.email.history.has_changes():
+        user.email_normalized = normalize_email(user.email)
+
+
+class RefreshToken(SQLModel, table=True):
+    """Issued refresh tokens, stored as digests and grouped into rotation families."""
+
+    jti: str = Field(primary_key=True)
+    family_id: uuid.UUID = Field(index=True)
+    user_id: uuid.UUID = Field(
+        sa_column=Column(
+            Uuid,
+            ForeignKey("user.id", ondelete="CASCADE"),
+            index=True,
+            nullable=False,
+        )
+    )
+    token_hash: str
+    expires_at: datetime = Field(index=True, sa_type=DateTime(timezone=True))
+    created_at: datetime = Field(
+        default_factory=utc_now, sa_type=DateTime(timezone=True)
+    )
+    rotated_at: Optional[datetime] = Field(
+        default=None, sa_type=DateTime(timezone=True)
+    )
+    revoked_at: Optional[datetime] = Field(
+        default=None, sa_type=DateTime(timezone=True)
+    )
+
+
+class RevokedToken(SQLModel, table=True):
+    """Access tokens revoked before their expiry (e.g. on logout)."""
+
+    jti: str = Field(primary_key=True)
+    expires_at: datetime = Field(index=True, sa_type=DateTime(timezone=True))
+    revoked_at: datetime = Field(
+        default_factory=utc_now, index=True, sa_type=DateTime(timezone=True)
+    )
+
+
+class EmailVerificationToken(SQLModel, table=True):
+    """Outstanding email verification tokens, stored only as digests."""
+
+    token_hash: str = Field(primary_key=True)
+    user_id: uuid.UUID = Field(
+        sa_column=Column(
+            Uuid,
+            ForeignKey("user.id", ondelete="CASCADE"),
+            index=True,
+            nullable=False,
+        )
+    )
+    expires_at: datetime = Field(index=True, sa_type=DateTime(timezone=True))
+    created_at: datetime = Field(
+        default_factory=utc_now, sa_type=DateTime(timezone=True)
+    )
+
+
+class LoginLockout(SQLModel, table=True):
+    """Failed-login counter and lock of a user, kept off the user row.
+
+    A row exists only between a failed login and the next successful one, so
+    brute-force attempts rewrite this narrow row instead of the user's.
+    """
+
+    user_id: uuid.UUID = Field(
+        sa_column=Column(
+            Uuid, ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+        )
+    )
+    failed_attempts: int = 0
+    locked_until: Optional[datetime] = Field(
+        default=None, sa_type=DateTime(timezone=True)
+    )
+    updated_at: datetime = Field(
+        default_factory=utc_now, sa_type=DateTime(timezone=True)
+    )
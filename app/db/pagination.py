@@ -0,0 +1,54 @@
+"""
+Keyset pagination helpers.
+Pages are ordered by a unique key and continue from the last row seen, so each
+page is an index range scan regardless of depth and is stable under inserts.
+Cursors are opaque to clients: URL-safe base64 of the JSON-encoded key.
+"""
+
+import base64
+import json
+from typing import Any
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+
+def encode_cursor(*key: Any) -> str:
+    raw = json.dumps([str(part) for part in key], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, parts: int) -> list[str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if not isinstance(key, list) or len(key) != parts:
+        raise ValueError("Invalid cursor")
+    if not all(isinstance(part, str) for part in key):
+        raise ValueError("Invalid cursor")
+    return key
+
+
+async def estimate_count(session: AsyncSession, statement: Select) -> int:
+    """Row count for ``statement``: the planner's estimate on PostgreSQL, else exact.
+
+    The statement is rendered with literal values for EXPLAIN, so it must only
+    carry trusted, non-string parameters (booleans, timestamps, ids).
+    """
+    bind = session.get_bind()
+    if bind.dialect.name != "postgresql":
+        result = await session.execute(
+            select(func.count()).select_from(statement.order_by(None).subquery())
+        )
+        return result.scalar_one()
+    sql = statement.order_by(None).compile(
+        dialect=bind.dialect, compile_kwargs={"literal_binds": True}
+    )
+    result = await session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
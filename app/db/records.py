@@ -0,0 +1,116 @@
+"""
+Lightweight, immutable user records.
+Used where a request only needs to read user attributes, so no ORM instance
+(with its password hash and session state) has to be loaded or carried around.
+"""
+
+import uuid
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Optional
+
+from app.db.models import LoginLockout, User
+
+
+def record_columns(record, **columns) -> list:
+    """User table columns in ``record``'s field order, so rows unpack positionally.
+
+    Fields that do not live on the user table are given as keyword ``columns``.
+    """
+    table = User.__table__.c
+    return [
+        columns[f.name] if f.name in columns else table[f.name] for f in fields(record)
+    ]
+
+
+@dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    id: uuid.UUID
+    email: str
+    is_active: bool
+    is_superuser: bool
+    email_verified: bool
+    created_at: datetime
+    token_version: int = 0
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            email=user.email,
+            is_active=user.is_active,
+            is_superuser=user.is_superuser,
+            email_verified=user.email_verified,
+            created_at=user.created_at,
+            token_version=user.token_version,
+        )
+
+    def to_read(self) -> dict:
+        """The public ``UserRead`` shape as plain JSON types, without validation."""
+        return {
+            "id": str(self.id),
+            "email": self.email,
+            "is_active": self.is_active,
+            "is_superuser": self.is_superuser,
+            "email_verified": self.email_verified,
+            "created_at": self.created_at.isoformat(),
+        }
+
+    def to_claims(self) -> dict:
+        """JWT claims that let a token stand in for this record."""
+        return {
+            "email": self.email,
+            "active": self.is_active,
+            "admin": self.is_superuser,
+            "verified": self.email_verified,
+            "created_at": self.created_at.isoformat(),
+        }
+
+    @classmethod
+    def from_claims(cls, payload: dict) -> Optional["UserSnapshot"]:
+        """Rebuild a record from token claims, or None if they are absent."""
+        try:
+            return cls(
+                id=uuid.UUID(payload["sub"]),
+                email=payload["email"],
+                is_active=payload["active"],
+                is_superuser=payload["admin"],
+                email_verified=payload["verified"],
+                created_at=datetime.fromisoformat(payload["created_at"]),
+                token_version=payload.get("ver", 0),
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+@dataclass(frozen=True, slots=True)
+class LoginRecord:
+    """The columns a login needs: the user's password hash plus its lockout state."""
+
+    id: uuid.UUID
+    email: str
+    hashed_password: str
+    is_active: bool
+    is_superuser: bool
+    email_verified: bool
+    failed_attempts: int
+    locked_until: Optional[datetime]
+    token_version: int
+    created_at: datetime
+
+    @classmethod
+    def from_user(
+        cls, user: User, lockout: Optional[LoginLockout] = None
+    ) -> "LoginRecord":
+        return cls(
+            id=user.id,
+            email=user.email,
+            hashed_password=user.hashed_password,
+            is_active=user.is_active,
+            is_superuser=user.is_superuser,
+            email_verified=user.email_verified,
+            failed_attempts=lockout.failed_attempts if lockout else 0,
+            locked_until=lockout.locked_until if lockout else None,
+            token_version=user.token_version,
+            created_at=user.created_at,
+        )
@@ -0,0 +1,83 @@
+"""
+Refresh token store.
+Each refresh token is recorded by ``jti`` with a digest of the token string and
+the rotation family it belongs to. Rotating marks the old row; presenting an
+already-rotated token is treated as theft and revokes the whole family.
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.security import create_refresh_token, token_digest
+from app.db.models import RefreshToken, User
+
+
+def issue_refresh_token(
+    session: AsyncSession, user: User, family_id: Optional[uuid.UUID] = None
+) -> str:
+    """Create a refresh token and stage its row; the caller commits"""
+    jti = str(uuid.uuid4())
+    expires_delta = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    token = create_refresh_token(
+        subject=str(user.id),
+        expires_delta=expires_delta,
+        token_version=user.token_version,
+        jti=jti,
+    )
+    session.add(
+        RefreshToken(
+            jti=jti,
+            family_id=family_id or uuid.uuid4(),
+            user_id=user.id,
+            token_hash=token_digest(token),
+            expires_at=datetime.now(timezone.utc) + expires_delta,
+        )
+    )
+    return token
+
+
+async def get_refresh_token(
+    session: AsyncSession, jti: str, token: str
+) -> Optional[RefreshToken]:
+    """Look up a stored refresh token by jti, checking it matches ``token``"""
+    row = await session.get(RefreshToken, jti)
+    if row is None or row.token_hash != token_digest(token):
+        return None
+    return row
+
+
+async def mark_rotated(session: AsyncSession, jti: str) -> bool:
+    """Atomically retire a token; False if it was already rotated or revoked"""
+    result = await session.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.jti == jti,
+            RefreshToken.rotated_at.is_(None),
+            RefreshToken.revoked_at.is_(None),
+        )
+        .values(rotated_at=datetime.now(timezone.utc))
+    )
+    return result.rowcount == 1
+
+
+async def revoke_family(session: AsyncSession, family_id: uuid.UUID) -> None:
+    """Revoke every live token descending from the same login"""
+    await session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+    )
+
+
+async def purge_expired_refresh_tokens(session: AsyncSession) -> int:
+    """Delete rows whose tokens can no longer be presented"""
+    result = await session.execute(
+        delete(RefreshToken).where(RefreshToken.expires_at < datetime.now(timezone.utc))
+    )
+    await session.commit()
+    return result.rowcount
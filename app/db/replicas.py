@@ -0,0 +1,146 @@
+"""
+Read replica routing.
+Read-only dependencies take their session from a healthy replica, picked
+round-robin or by lowest observed latency. Replicas failing health checks are
+skipped until they recover, and clients that have just written are kept on the
+primary for a short window so they read their own writes.
+"""
+
+import asyncio
+import itertools
+import time
+from typing import Optional
+
+from fastapi import Depends, Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.db.session import engine_options, get_session
+
+READ_PRIMARY_COOKIE = "read_primary"
+READ_PRIMARY_HEADER = "x-read-primary"
+
+# Weight of the newest sample in the latency moving average
+LATENCY_ALPHA = 0.2
+
+
+class Replica:
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.session_factory = sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+        self.healthy = True
+        self.latency = 0.0
+        self.sessions = 0
+        self.failures = 0
+
+
+class ReplicaRouter:
+    """Pick a replica per read-only request."""
+
+    def __init__(self, replicas: list[Replica], strategy: str = "round_robin"):
+        if strategy not in ("round_robin", "least_latency"):
+            raise ValueError(f"Unknown replica strategy {strategy}")
+        self.replicas = replicas
+        self.strategy = strategy
+        self.primary_reads = 0
+        self._turn = itertools.count()
+
+    @classmethod
+    def from_settings(cls) -> "ReplicaRouter":
+        urls = [u.strip() for u in settings.DATABASE_REPLICA_URLS.split(",")]
+        replicas = [
+            Replica(f"replica-{i}", create_async_engine(url, **engine_options(url)))
+            for i, url in enumerate(u for u in urls if u)
+        ]
+        return cls(replicas, settings.DATABASE_REPLICA_STRATEGY)
+
+    def choose(self) -> Optional[Replica]:
+        healthy = [r for r in self.replicas if r.healthy]
+        if not healthy:
+            return None
+        if self.strategy == "least_latency":
+            return min(healthy, key=lambda r: r.latency)
+        return healthy[next(self._turn) % len(healthy)]
+
+    async def check(self, replica: Replica) -> None:
+        """Probe one replica with ``SELECT 1`` and update its health and latency"""
+
+        async def probe():
+            async with replica.engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(
+                probe(), timeout=settings.REPLICA_HEALTH_CHECK_TIMEOUT_SECONDS
+            )
+        except Exception as e:
+            if replica.healthy:
+                logger.warning(f"Replica {replica.name} marked unhealthy: {e!r}")
+            replica.healthy = False
+            replica.failures += 1
+            return
+        elapsed = time.perf_counter() - start
+        if replica.latency:
+            elapsed = (1 - LATENCY_ALPHA) * replica.latency + LATENCY_ALPHA * elapsed
+        replica.latency = elapsed
+        if not replica.healthy:
+            logger.info(f"Replica {replica.name} recovered")
+        replica.healthy = True
+
+    async def check_all(self) -> None:
+        await asyncio.gather(*(self.check(r) for r in self.replicas))
+
+    def stats(self) -> dict:
+        return {
+            "strategy": self.strategy,
+            "primary_reads": self.primary_reads,
+            "replicas": [
+                {
+                    "name": r.name,
+                    "healthy": r.healthy,
+                    "latency_ms": round(r.latency * 1000, 2),
+                    "sessions": r.sessions,
+                    "failures": r.failures,
+                }
+                for r in self.replicas
+            ],
+        }
+
+
+replica_router = ReplicaRouter.from_settings()
+
+
+async def replica_health_loop(router: ReplicaRouter) -> None:
+    """Re-probe replicas for the lifetime of the app"""
+    while True:
+        await router.check_all()
+        await asyncio.sleep(settings.REPLICA_HEALTH_CHECK_INTERVAL_SECONDS)
+
+
+def wants_primary(request: Request) -> bool:
+    """Clients that wrote recently (or ask explicitly) read from the primary"""
+    return bool(
+        request.cookies.get(READ_PRIMARY_COOKIE)
+        or request.headers.get(READ_PRIMARY_HEADER)
+    )
+
+
+async def get_read_session(
+    request: Request, primary: AsyncSession = Depends(get_session)
+) -> AsyncSession:
+    """Session for read-only queries: a replica when one is usable, else primary"""
+    replica = None if wants_primary(request) else replica_router.choose()
+    if replica is None:
+        replica_router.primary_reads += 1
+        yield primary
+        return
+    replica.sessions += 1
+    async with replica.session_factory() as session:
+        yield session
@@ -0,0 +1,97 @@
+"""
+Access token revocation.
+Revocations are persisted in the revokedtoken table and mirrored into an
+in-process RevocationIndex that is consulted on every authenticated request.
+Workers pull revocations made elsewhere on a short interval. ``revoked_at`` and
+the sync watermark both come from the database clock, so clock skew between
+workers cannot open a gap, and each sync re-reads REVOCATION_SYNC_OVERLAP_SECONDS
+before the watermark for transactions that committed late.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.revocation import RevocationIndex
+from app.db.models import RevokedToken
+
+revocation_index = RevocationIndex(
+    bucket_seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    capacity=settings.REVOCATION_FILTER_CAPACITY,
+    error_rate=settings.REVOCATION_FILTER_ERROR_RATE,
+)
+
+_synced_until: datetime | None = None
+
+
+def revoke_token(session: AsyncSession, jti: str, exp: float) -> None:
+    """Stage a revocation for the caller's commit and apply it locally"""
+    session.add(
+        RevokedToken(
+            jti=jti,
+            expires_at=datetime.fromtimestamp(exp, tz=timezone.utc),
+            revoked_at=func.now(),
+        )
+    )
+    revocation_index.add(jti, exp)
+
+
+async def is_token_revoked(session: AsyncSession, payload: dict) -> bool:
+    """Check a decoded token; only filter positives touch the database"""
+    jti, exp = payload.get("jti"), payload.get("exp")
+    if not jti or exp is None:
+        return False
+    if not revocation_index.might_contain(jti, exp):
+        return False
+    return await session.get(RevokedToken, jti) is not None
+
+
+async def sync_revocations(session: AsyncSession) -> int:
+    """Load revocations recorded since the last sync (all live ones at first)"""
+    global _synced_until
+    now = datetime.now(timezone.utc)
+    synced_until = (await session.execute(select(func.now()))).scalar_one()
+    statement = select(RevokedToken.jti, RevokedToken.expires_at).where(
+        RevokedToken.expires_at > now
+    )
+    if _synced_until is not None:
+        statement = statement.where(
+            RevokedToken.revoked_at
+            >= _synced_until
+            - timedelta(seconds=settings.REVOCATION_SYNC_OVERLAP_SECONDS)
+        )
+    result = await session.execute(statement)
+    loaded = 0
+    for jti, expires_at in result:
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        revocation_index.add(jti, expires_at.timestamp())
+        loaded += 1
+    revocation_index.expire()
+    _synced_until = synced_until
+    return loaded
+
+
+async def revocation_sync_loop(session_factory) -> None:
+    """Keep the local index current; runs for the lifetime of the app"""
+    while True:
+        try:
+            async with session_factory() as session:
+                await sync_revocations(session)
+        except Exception as e:
+            logger.error(f"Revocation sync failed: {e}")
+        await asyncio.sleep(settings.REVOCATION_SYNC_INTERVAL_SECONDS)
+
+
+async def purge_expired_revocations(session: AsyncSession) -> int:
+    """Delete revocations of tokens that have expired anyway"""
+    result = await session.execute(
+        delete(RevokedToken).where(RevokedToken.expires_at < datetime.now(timezone.utc))
+    )
+    await session.commit()
+    return result.rowcount
@@ -1,15 +1,95 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from app.core.config import settings
 
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts take and how often they time out."""
+
+    def __init__(self, *args, max_overflow: int = 10, **kwargs):
+        super().__init__(*args, max_overflow=max_overflow, **kwargs)
+        self.max_overflow = max_overflow
+        self.checkouts = 0
+        self.timeouts = 0
+        self.checkout_seconds = 0.0
+        self.max_checkout_seconds = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.checkouts += 1
+            self.checkout_seconds += elapsed
+            self.max_checkout_seconds = max(self.max_checkout_seconds, elapsed)
+
+
+def engine_options(url: str) -> dict:
+    """Pool settings for ``url``; SQLite keeps SQLAlchemy's default pooling."""
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    }
+
+
+def pool_stats(engine: AsyncEngine) -> dict:
+    """Point-in-time pool usage for the metrics endpoint."""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+    stats = {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+    }
+    if isinstance(pool, InstrumentedQueuePool):
+        checkouts = pool.checkouts
+        stats.update(
+            max_overflow=pool.max_overflow,
+            checkouts=checkouts,
+            timeouts=pool.timeouts,
+            avg_checkout_ms=(
+                round(pool.checkout_seconds / checkouts * 1000, 2) if checkouts else 0.0
+            ),
+            max_checkout_ms=round(pool.max_checkout_seconds * 1000, 2),
+        )
+    return stats
+
+
 ASYNC_DATABASE_URL = settings.DATABASE_URL.replace(
     "postgresql+asyncpg://", "postgresql+asyncpg://"
 )  # keep same
-engine = create_async_engine(settings.DATABASE_URL, echo=False, future=True)
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=False,
+    future=True,
+    **engine_options(settings.DATABASE_URL),
+)
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
 async def get_session() -> AsyncSession:
     async with async_session() as session:
         yield session
+
+
+def get_session_factory():
+    """Session factory for work that outlives the request scope (e.g. streaming)"""
+    return async_session
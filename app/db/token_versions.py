@@ -0,0 +1,53 @@
+"""
+Per-user token version lookups.
+Every issued token carries the user's ``token_version``; bumping the column
+revokes all of that user's outstanding tokens. Versions are cached briefly per
+worker so validating a stateless token rarely needs the database.
+"""
+
+import uuid
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.models import User
+
+_versions = TTLCache(
+    maxsize=settings.TOKEN_VERSION_CACHE_SIZE,
+    ttl=settings.TOKEN_VERSION_CACHE_TTL_SECONDS,
+)
+
+
+async def get_token_version(session: AsyncSession, user_id: str) -> Optional[int]:
+    """Current token version for a user, or None if the user does not exist"""
+    version = _versions.get(user_id)
+    if version is not None:
+        return version
+    try:
+        user_uuid = uuid.UUID(user_id)
+    except ValueError:
+        return None
+    result = await session.execute(
+        select(User.token_version).where(User.id == user_uuid)
+    )
+    version = result.scalar_one_or_none()
+    if version is not None:
+        _versions.set(user_id, version)
+    return version
+
+
+def bump_token_version(user: User) -> None:
+    """Revoke every token issued to ``user``; takes effect when committed"""
+    user.token_version += 1
+
+
+def forget_token_version(user_id) -> None:
+    """Drop the cached version; call after committing a bump or a deletion"""
+    _versions.pop(str(user_id))
+
+
+def cache_stats() -> dict:
+    return _versions.stats()
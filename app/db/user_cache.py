@@ -0,0 +1,52 @@
+"""
+Read-through cache of user records.
+Holds immutable UserSnapshot values (never ORM instances) by id for a short
+TTL per worker. Every code path that changes a user calls ``forget_user`` after
+committing; other workers converge within USER_CACHE_TTL_SECONDS.
+
+The cache sits behind the snapshot lookups rather than ``crud.get_user`` /
+``get_user_by_email``: those return ORM instances that callers modify and
+commit, which must never come from a cache. Checks that guard a write (such as
+"is this email taken") must not use it either; they query the primary directly.
+"""
+
+import uuid
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.records import UserSnapshot
+from app.db.user_queries import fetch_user_snapshot
+
+_by_id = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+
+def _remember(snapshot: UserSnapshot) -> UserSnapshot:
+    _by_id.set(str(snapshot.id), snapshot)
+    return snapshot
+
+
+async def get_user_snapshot(
+    session: AsyncSession, user_id: str
+) -> Optional[UserSnapshot]:
+    """User record by id, from the cache when fresh"""
+    snapshot = _by_id.get(str(user_id))
+    if snapshot is not None:
+        return snapshot
+    try:
+        user_uuid = uuid.UUID(str(user_id))
+    except ValueError:
+        return None
+    snapshot = await fetch_user_snapshot(session, user_uuid)
+    return _remember(snapshot) if snapshot is not None else None
+
+
+def forget_user(user_id) -> None:
+    """Drop a cached record; call after committing any change to the user"""
+    _by_id.pop(str(user_id))
+
+
+def cache_stats() -> dict:
+    return _by_id.stats()
@@ -0,0 +1,221 @@
+"""
+Hot identity queries.
+The lookups behind every authenticated request and login (user by id, user by
+email) and the lockout updates run as Core statements built once at import with
+bound parameters: SQLAlchemy compiles each a single time and, on asyncpg, runs
+them as cached prepared statements. Rows are returned as slotted records rather
+than ORM instances, so there is no identity map or model hydration. Reads on
+dialects outside FAST_PATH_DIALECTS (SQLite in tests and local development) go
+through the ORM instead; updates are Core everywhere so counters stay atomic.
+Lockout state lives in ``loginlockout``, so failed logins never write the user
+row, and a login in the common case is one index-only probe of ``ix_user_login``
+plus a primary-key lookup of the lockout row.
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import and_, bindparam, case, delete, func, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.emails import normalize_email
+from app.db import crud
+from app.db.models import LoginLockout, User
+from app.db.records import LoginRecord, UserSnapshot, record_columns
+
+FAST_PATH_DIALECTS = {"postgresql"}
+
+_user = User.__table__
+_lockout = LoginLockout.__table__
+
+
+# Email lookups probe the key alone, which ix_user_login answers from the index
+# (its INCLUDE list holds every column read), and only then the exact address
+# among rows without a key; one OR of both would need a BitmapOr and heap reads
+_by_key = _user.c.email_normalized == bindparam("key")
+_unkeyed_by_email = and_(
+    _user.c.email_normalized.is_(None), _user.c.email == bindparam("email")
+)
+_snapshot_by_id = select(*record_columns(UserSnapshot)).where(
+    _user.c.id == bindparam("user_id")
+)
+_snapshot = select(*record_columns(UserSnapshot))
+_snapshot_by_key = _snapshot.where(_by_key)
+_snapshot_unkeyed = _snapshot.where(_unkeyed_by_email)
+_login = select(
+    *record_columns(
+        LoginRecord,
+        failed_attempts=func.coalesce(_lockout.c.failed_attempts, 0),
+        locked_until=_lockout.c.locked_until,
+    )
+).select_from(_user.outerjoin(_lockout, _lockout.c.user_id == _user.c.id))
+_login_by_key = _login.where(_by_key)
+_login_unkeyed = _login.where(_unkeyed_by_email)
+
+
+def _count_failure(insert):
+    """Upsert counting one failure, for the dialect's ``insert``"""
+    reached_limit = _lockout.c.failed_attempts + 1 >= bindparam(
+        "max_attempts", type_=_lockout.c.failed_attempts.type
+    )
+    lock_until = bindparam("lock_until", type_=_lockout.c.locked_until.type)
+    return (
+        insert(_lockout)
+        .values(
+            user_id=bindparam("user_id"),
+            failed_attempts=bindparam("first_attempts"),
+            locked_until=bindparam("first_lock", type_=_lockout.c.locked_until.type),
+            updated_at=bindparam("now"),
+        )
+        .on_conflict_do_update(
+            index_elements=[_lockout.c.user_id],
+            set_={
+                "failed_attempts": case(
+                    (reached_limit, 0), else_=_lockout.c.failed_attempts + 1
+                ),
+                "locked_until": case(
+                    (reached_limit, lock_until), else_=_lockout.c.locked_until
+                ),
+                "updated_at": bindparam("now"),
+            },
+            where=or_(
+                _lockout.c.locked_until.is_(None),
+                _lockout.c.locked_until <= bindparam("now"),
+            ),
+        )
+        .returning(_lockout.c.locked_until)
+    )
+
+
+_count_failures = {
+    "postgresql": _count_failure(postgresql.insert),
+    "sqlite": _count_failure(sqlite.insert),
+}
+_clear_lockout = delete(_lockout).where(_lockout.c.user_id == bindparam("user_id"))
+_store_hash = (
+    update(_user)
+    .where(_user.c.id == bindparam("user_id"))
+    .values(hashed_password=bindparam("new_hash"))
+)
+
+
+def _fast_path(session: AsyncSession) -> bool:
+    return session.bind.dialect.name in FAST_PATH_DIALECTS
+
+
+async def _first(session: AsyncSession, statement, params: dict):
+    conn = await session.connection()
+    return (await conn.execute(statement, params)).first()
+
+
+async def _first_by_email(session: AsyncSession, by_key, unkeyed, email: str):
+    """The row for ``email``: an exact address match wins over the keyed row.
+
+    The second probe (on ix_user_email) only runs when the keyed row is missing
+    or differs in case, where an unkeyed case duplicate could be the account.
+    """
+    row = await _first(session, by_key, {"key": normalize_email(email)})
+    if row is None or row.email != email:
+        row = await _first(session, unkeyed, {"email": email}) or row
+    return row
+
+
+async def fetch_user_snapshot(
+    session: AsyncSession, user_id: uuid.UUID
+) -> Optional[UserSnapshot]:
+    """User record by id"""
+    if not _fast_path(session):
+        user = await session.get(User, user_id)
+        return UserSnapshot.from_user(user) if user is not None else None
+    row = await _first(session, _snapshot_by_id, {"user_id": user_id})
+    return UserSnapshot(*row) if row is not None else None
+
+
+async def fetch_user_snapshot_by_email(
+    session: AsyncSession, email: str
+) -> Optional[UserSnapshot]:
+    """User record by email, ignoring case"""
+    if not _fast_path(session):
+        user = await crud.get_user_by_email(session, email)
+        return UserSnapshot.from_user(user) if user is not None else None
+    row = await _first_by_email(session, _snapshot_by_key, _snapshot_unkeyed, email)
+    return UserSnapshot(*row) if row is not None else None
+
+
+async def fetch_login_record(
+    session: AsyncSession, email: str
+) -> Optional[LoginRecord]:
+    """Credentials and lockout state for a login attempt"""
+    if not _fast_path(session):
+        statement = crud.email_lookup(
+            select(User, LoginLockout).outerjoin(
+                LoginLockout, LoginLockout.user_id == User.id
+            ),
+            email,
+        )
+        row = (await session.execute(statement)).first()
+        return LoginRecord.from_user(*row) if row is not None else None
+    row = await _first_by_email(session, _login_by_key, _login_unkeyed, email)
+    return LoginRecord(*row) if row is not None else None
+
+
+async def record_failed_login(
+    session: AsyncSession, user_id: uuid.UUID, now: datetime
+) -> Optional[datetime]:
+    """Count a failed login in one upsert on ``loginlockout``; the caller commits.
+
+    The increment happens in the database, so concurrent failures are never
+    lost, and attempts against an account that is already locked are ignored.
+    Reaching ``MAX_LOGIN_ATTEMPTS`` resets the counter and locks the account;
+    the new ``locked_until`` is returned in that case, otherwise None.
+    """
+    now = now.astimezone(timezone.utc)
+    lock_until = now + timedelta(minutes=settings.LOCKOUT_DURATION_MINUTES)
+    # Values for the first failure, when there is no row to update yet
+    locks_at_once = settings.MAX_LOGIN_ATTEMPTS <= 1
+    row = await _first(
+        session,
+        _count_failures[session.bind.dialect.name],
+        {
+            "user_id": user_id,
+            "now": now,
+            "max_attempts": settings.MAX_LOGIN_ATTEMPTS,
+            "lock_until": lock_until,
+            "first_attempts": 0 if locks_at_once else 1,
+            "first_lock": lock_until if locks_at_once else None,
+        },
+    )
+    locked_until = row.locked_until if row is not None else None
+    if locked_until is None:
+        return None
+    # SQLite hands back naive values
+    if locked_until.tzinfo is None:
+        locked_until = locked_until.replace(tzinfo=timezone.utc)
+    return locked_until if locked_until > now else None
+
+
+async def record_successful_login(
+    session: AsyncSession, record: LoginRecord, new_hash: Optional[str] = None
+) -> bool:
+    """Clear lockout state and store an upgraded hash, only where there is any.
+
+    Returns whether anything was written; the caller commits.
+    """
+    reset = bool(record.failed_attempts or record.locked_until)
+    if new_hash is None and not reset:
+        return False
+    conn = await session.connection()
+    if reset:
+        await conn.execute(_clear_lockout, {"user_id": record.id})
+    if new_hash is not None:
+        await conn.execute(_store_hash, {"user_id": record.id, "new_hash": new_hash})
+    return True
+
+
+async def clear_login_lockout(session: AsyncSession, user_id: uuid.UUID) -> None:
+    """Drop any failure count or lock of a user; the caller commits"""
+    conn = await session.connection()
+    await conn.execute(_clear_lockout, {"user_id": user_id})
@@ -0,0 +1,70 @@
+"""
+Email verification tokens.
+Only a SHA-256 digest of each token is stored, as the primary key, so
+verifying a link is a single index probe and a leaked table cannot be replayed.
+Tokens expire and are single use; expired rows are removed by a purge job.
+"""
+
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.security import token_digest
+from app.db.models import EmailVerificationToken
+
+
+def new_verification_token() -> tuple[str, dict]:
+    """A fresh token and the column values of its row (minus ``user_id``)"""
+    token = secrets.token_urlsafe(32)
+    now = datetime.now(timezone.utc)
+    return token, {
+        "token_hash": token_digest(token),
+        "expires_at": now + timedelta(hours=settings.EMAIL_VERIFICATION_EXPIRE_HOURS),
+        "created_at": now,
+    }
+
+
+def issue_verification_token(session: AsyncSession, user_id: uuid.UUID) -> str:
+    """Create a token and stage its row; the caller commits and mails the token"""
+    token, values = new_verification_token()
+    session.add(EmailVerificationToken(user_id=user_id, **values))
+    return token
+
+
+async def reissue_verification_token(session: AsyncSession, user_id: uuid.UUID) -> str:
+    """Replace a user's outstanding tokens with a new one; the caller commits"""
+    await session.execute(
+        delete(EmailVerificationToken).where(EmailVerificationToken.user_id == user_id)
+    )
+    return issue_verification_token(session, user_id)
+
+
+async def consume_verification_token(
+    session: AsyncSession, token: str
+) -> Optional[uuid.UUID]:
+    """Delete a live token in one statement and return its user id"""
+    result = await session.execute(
+        delete(EmailVerificationToken)
+        .where(
+            EmailVerificationToken.token_hash == token_digest(token),
+            EmailVerificationToken.expires_at > datetime.now(timezone.utc),
+        )
+        .returning(EmailVerificationToken.user_id)
+    )
+    return result.scalar_one_or_none()
+
+
+async def purge_expired_verification_tokens(session: AsyncSession) -> int:
+    """Delete tokens that can no longer be used"""
+    result = await session.execute(
+        delete(EmailVerificationToken).where(
+            EmailVerificationToken.expires_at < datetime.now(timezone.utc)
+        )
+    )
+    await session.commit()
+    return result.rowcount
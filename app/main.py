@@ -1,19 +1,27 @@
-from fastapi import FastAPI
+import asyncio
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.responses import JSONResponse
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 
-from app.api.v1 import auth, users
+from app.api.v1 import auth, jwks, metrics, users
 from app.core.config import settings
+from app.core.hashing import HashingOverloadedError, calibrate_bcrypt_cost, hasher
 from app.core.logging import logger
 from app.core.middleware import (
     HTTPSRedirectMiddleware,
+    ReadYourWritesMiddleware,
     RequestLoggingMiddleware,
     SecurityHeadersMiddleware,
 )
 from app.core.rate_limit import limiter
+from app.db.replicas import replica_health_loop, replica_router
+from app.db.revocations import revocation_sync_loop
+from app.db.session import async_session
 
 app = FastAPI(
     title="Secure Auth Service",
@@ -24,11 +32,26 @@ app = FastAPI(
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+
+@app.exception_handler(HashingOverloadedError)
+async def hashing_overloaded_handler(request: Request, exc: HashingOverloadedError):
+    """Shed password-hashing work fast instead of queueing it without bound."""
+    logger.warning(
+        f"LOAD_SHED: {request.method} {request.url.path} - hashing saturated"
+    )
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Service temporarily overloaded, please retry"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 # Add security middleware (order matters!)
 app.add_middleware(HTTPSRedirectMiddleware)  # First - redirect HTTP to HTTPS
 app.add_middleware(SecurityHeadersMiddleware)  # Second - add security headers
 app.add_middleware(RequestLoggingMiddleware)  # Third - log requests
 app.add_middleware(SlowAPIMiddleware)  # Fourth - rate limiting
+app.add_middleware(ReadYourWritesMiddleware)  # Fifth - replica stickiness
 
 
 # Security Middleware
@@ -51,6 +74,40 @@ app.add_middleware(
 
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(users.router, prefix="/users", tags=["users"])
+app.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
+app.include_router(jwks.router, tags=["jwks"])
+
+
+@app.on_event("startup")
+async def calibrate_password_hashing():
+    if settings.BCRYPT_CALIBRATE_ON_STARTUP:
+        await calibrate_bcrypt_cost()
+
+
+@app.on_event("startup")
+async def start_revocation_sync():
+    if settings.REVOCATION_SYNC_INTERVAL_SECONDS > 0:
+        app.state.revocation_sync = asyncio.create_task(
+            revocation_sync_loop(async_session)
+        )
+
+
+@app.on_event("startup")
+async def start_replica_health_checks():
+    if replica_router.replicas:
+        await replica_router.check_all()
+        app.state.replica_health = asyncio.create_task(
+            replica_health_loop(replica_router)
+        )
+
+
+@app.on_event("shutdown")
+async def shutdown_background_work():
+    for name in ("revocation_sync", "replica_health"):
+        task = getattr(app.state, name, None)
+        if task is not None:
+            task.cancel()
+    hasher.shutdown()
 
 
 @app.get("/health")
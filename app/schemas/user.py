@@ -19,6 +19,22 @@ class UserRead(BaseModel):
     created_at: datetime
 
 
+class VerificationResendRequest(BaseModel):
+    email: EmailStr
+
+
 class UserUpdate(BaseModel):
     email: Optional[EmailStr] = None
     password: Optional[str] = None
+
+
+class UserImport(BaseModel):
+    """One line of a bulk import: a plaintext ``password`` or a ``hashed_password``"""
+
+    model_config = {"extra": "forbid"}
+
+    email: EmailStr
+    password: Optional[str] = None
+    hashed_password: Optional[str] = None
+    is_active: bool = True
+    email_verified: bool = True
@@ -1,5 +1,7 @@
 import uuid
+from datetime import datetime, timedelta
 
+import anyio
 import pytest
 from httpx import AsyncClient
 from slowapi import Limiter, _rate_limit_exceeded_handler
@@ -10,6 +12,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlmodel import SQLModel
 
 from app.core.middleware import HTTPSRedirectMiddleware
+from app.core.security import get_password_hash
 from app.db.models import User
 from app.main import app
 
@@ -49,6 +52,84 @@ def get_test_limiter():
 
 app.state.limiter = get_test_limiter()
 
+# Verification tokens are only ever mailed, so tests capture them here
+SENT_TOKENS: dict[str, str] = {}
+
+
+@pytest.fixture(autouse=True)
+def capture_verification_emails(monkeypatch):
+    from app.api.v1 import auth
+
+    SENT_TOKENS.clear()
+    monkeypatch.setattr(
+        auth,
+        "send_verification_email",
+        lambda email, token: SENT_TOKENS.update({email: token}),
+    )
+
+
+def run_api_test(test_func):
+    """Run ``await test_func(client)`` against a fresh schema from a sync test."""
+
+    async def runner():
+        async with engine_test.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        try:
+            from app.core.rate_limit import disable_test_rate_limits
+            from app.db.session import get_session, get_session_factory
+
+            disable_test_rate_limits()
+            app.dependency_overrides.clear()
+            app.dependency_overrides[get_session] = override_get_session
+            app.dependency_overrides[get_session_factory] = lambda: AsyncSessionLocal
+            app.state.limiter = get_test_limiter()
+            async with AsyncClient(app=app, base_url="http://testserver") as c:
+                await test_func(c)
+        finally:
+            async with engine_test.begin() as conn:
+                await conn.run_sync(SQLModel.metadata.drop_all)
+
+    anyio.run(runner)
+
+
+async def create_verified_user(email: str, password: str = "StrongPassw0rd!", **kw):
+    async with AsyncSessionLocal() as session:
+        user = User(
+            id=uuid.uuid4(),
+            email=email,
+            hashed_password=get_password_hash(password, rounds=4),
+            email_verified=True,
+            **kw,
+        )
+        session.add(user)
+        await session.commit()
+        await session.refresh(user)
+        return user
+
+
+async def login(client, email: str, password: str = "StrongPassw0rd!"):
+    r = await client.post("/auth/login", json={"email": email, "password": password})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+async def seed_users(count: int):
+    """Users sharing created_at values in pairs, to exercise the id tie-break"""
+    base = datetime(2024, 1, 1)
+    hashed = get_password_hash("StrongPassw0rd!", rounds=4)
+    async with AsyncSessionLocal() as session:
+        for i in range(count):
+            session.add(
+                User(
+                    id=uuid.uuid4(),
+                    email=f"page{i}@example.com",
+                    hashed_password=hashed,
+                    is_active=i % 3 != 0,
+                    created_at=base + timedelta(seconds=i // 2),
+                )
+            )
+        await session.commit()
+
 
 @pytest.fixture(scope="function", autouse=True)
 async def prepare_db():
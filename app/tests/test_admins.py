@@ -0,0 +1,30 @@
+from app.tests.conftest import create_verified_user, login, run_api_test, seed_users
+
+
+def test_last_active_admin_cannot_be_removed():
+    """Admins can be removed while another active admin remains, never the last"""
+
+    async def async_test(client):
+        await seed_users(5)
+        first = await create_verified_user("first-admin@example.com", is_superuser=True)
+        second = await create_verified_user(
+            "second-admin@example.com", is_superuser=True
+        )
+        dormant = await create_verified_user(
+            "dormant-admin@example.com", is_superuser=True, is_active=False
+        )
+        tokens = await login(client, "first-admin@example.com")
+        auth = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+        r = await client.post(f"/users/{second.id}/deactivate", headers=auth)
+        assert r.status_code == 200
+        # Inactive admins do not count towards (or against) the guard
+        r = await client.delete(f"/users/{dormant.id}", headers=auth)
+        assert r.status_code == 200
+
+        r = await client.post(f"/users/{first.id}/deactivate", headers=auth)
+        assert r.status_code == 400
+        r = await client.delete(f"/users/{first.id}", headers=auth)
+        assert r.status_code == 400
+
+    run_api_test(async_test)
@@ -1,5 +1,7 @@
 import anyio
 
+from app.tests.conftest import SENT_TOKENS
+
 
 def test_register_and_verify_email():
     """Test user registration and email verification"""
@@ -33,21 +35,8 @@ def test_register_and_verify_email():
                     "/auth/register", json={"email": email, "password": password}
                 )
                 assert r.status_code == 201
-                # Extract token from console output (simulate)
-                # In real test, you would mock send_verification_email and capture the token
-                # For now, fetch user from DB and get token
-                from app.db.models import User
-                from app.tests.conftest import AsyncSessionLocal  # type: ignore
-
-                async with AsyncSessionLocal() as session:  # type: ignore
-                    from sqlmodel import select
-
-                    result = await session.execute(
-                        select(User).where(User.email == email)
-                    )
-                    user = result.scalar_one_or_none()
-                    assert user is not None
-                    token = user.email_verification_token
+                # Token captured from the (patched) verification email
+                token = SENT_TOKENS[email]
                 # Verify email
                 r2 = await client.get(f"/auth/verify-email?token={token}")
                 assert r2.status_code == 200
@@ -83,15 +72,7 @@ def test_login_and_lockout():
                 "/auth/register", json={"email": email, "password": password}
             )
             assert r.status_code == 201
-            from app.db.models import User
-            from app.tests.conftest import AsyncSessionLocal  # type: ignore
-
-            async with AsyncSessionLocal() as session:  # type: ignore
-                from sqlmodel import select
-
-                result = await session.execute(select(User).where(User.email == email))
-                user = result.scalar_one_or_none()
-                token = user.email_verification_token
+            token = SENT_TOKENS[email]
             await client.get(f"/auth/verify-email?token={token}")
             # Fail login 5 times
             for _ in range(5):
@@ -138,15 +119,7 @@ def test_rate_limiting():
                 "/auth/register", json={"email": email, "password": password}
             )
             assert r.status_code == 201
-            from app.db.models import User
-            from app.tests.conftest import AsyncSessionLocal  # type: ignore
-
-            async with AsyncSessionLocal() as session:  # type: ignore
-                from sqlmodel import select
-
-                result = await session.execute(select(User).where(User.email == email))
-                user = result.scalar_one_or_none()
-                token = user.email_verification_token
+            token = SENT_TOKENS[email]
             await client.get(f"/auth/verify-email?token={token}")
             # Exceed login rate limit
             try:
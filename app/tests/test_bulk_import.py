@@ -0,0 +1,130 @@
+import json
+
+import anyio
+from sqlmodel import select
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.db import bulk_import
+from app.db.models import User
+from app.tests.conftest import (
+    AsyncSessionLocal,
+    create_verified_user,
+    engine_test,
+    login,
+    run_api_test,
+)
+
+
+def _ndjson(*records) -> str:
+    return "".join((r if isinstance(r, str) else json.dumps(r)) + "\n" for r in records)
+
+
+def test_import_endpoint_reports_inserts_conflicts_and_errors():
+    """Plaintext and pre-hashed users are created; duplicates and bad lines reported"""
+
+    async def async_test(client):
+        await create_verified_user("importer@example.com", is_superuser=True)
+        tokens = await login(client, "importer@example.com")
+        auth = {"Authorization": f"Bearer {tokens['access_token']}"}
+        body = _ndjson(
+            {"email": "plain@example.com", "password": "StrongPassw0rd!"},
+            {
+                "email": "hashed@example.com",
+                "hashed_password": get_password_hash("StrongPassw0rd!", rounds=4),
+            },
+            {"email": "importer@example.com", "password": "StrongPassw0rd!"},
+            {"email": "plain@example.com", "password": "Another1!"},
+            {"email": "md5@example.com", "hashed_password": "5f4dcc3b5aa765d61d83"},
+            "{not json",
+            {"email": "not-an-email", "password": "x"},
+        )
+
+        r = await client.post("/users/import", content=body, headers=auth)
+        assert r.status_code == 200, r.text
+        report = r.json()
+        assert report["received"] == 7
+        assert report["inserted"] == 2
+        assert report["conflicts"] == 2
+        assert sorted(report["conflicting_emails"]) == [
+            "importer@example.com",
+            "plain@example.com",
+        ]
+        assert report["invalid"] == 3
+        assert [e["line"] for e in report["errors"]] == [5, 6, 7]
+
+        await login(client, "plain@example.com")
+        await login(client, "hashed@example.com")
+
+        r = await client.post("/users/import", content=body, headers=auth)
+        assert r.json()["inserted"] == 0
+
+    run_api_test(async_test)
+
+
+def test_import_batches_split_lines_across_chunks():
+    """Lines split across stream chunks are reassembled and batches committed"""
+
+    async def scenario():
+        from sqlmodel import SQLModel
+
+        async with engine_test.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        try:
+            digest = get_password_hash("StrongPassw0rd!", rounds=4)
+            body = _ndjson(
+                *(
+                    {"email": f"bulk{i}@example.com", "hashed_password": digest}
+                    for i in range(7)
+                )
+            ).encode()
+
+            async def chunks():
+                for i in range(0, len(body), 50):
+                    yield body[i : i + 50]
+
+            batches = []
+            report = await bulk_import.import_users(
+                AsyncSessionLocal, chunks(), batch_size=3, on_batch=batches.append
+            )
+            async with AsyncSessionLocal() as session:
+                emails = (await session.execute(select(User.email))).scalars().all()
+        finally:
+            async with engine_test.begin() as conn:
+                await conn.run_sync(SQLModel.metadata.drop_all)
+        assert report["inserted"] == 7 and report["batches"] == 3
+        assert [b["inserted"] for b in batches] == [3, 6, 7]
+        assert len(emails) == 7
+
+    anyio.run(scenario)
+
+
+def test_http_import_limits(monkeypatch):
+    """Weak and excess plaintext passwords are refused; oversized input is a 413"""
+    monkeypatch.setattr(settings, "BULK_IMPORT_MAX_PLAINTEXT_ROWS", 1)
+    monkeypatch.setattr(settings, "BULK_IMPORT_MAX_LINE_BYTES", 200)
+
+    async def async_test(client):
+        await create_verified_user("limits@example.com", is_superuser=True)
+        tokens = await login(client, "limits@example.com")
+        auth = {"Authorization": f"Bearer {tokens['access_token']}"}
+        body = _ndjson(
+            {"email": "weak@example.com", "password": "password"},
+            {"email": "first@example.com", "password": "StrongPassw0rd!"},
+            {"email": "second@example.com", "password": "StrongPassw0rd!"},
+        )
+        r = await client.post("/users/import", content=body, headers=auth)
+        report = r.json()
+        assert report["inserted"] == 1 and report["invalid"] == 2
+        assert "uppercase" in report["errors"][0]["error"]
+        assert "plaintext" in report["errors"][1]["error"]
+
+        long_line = _ndjson({"email": "long@example.com", "password": "x" * 300})
+        r = await client.post("/users/import", content=long_line, headers=auth)
+        assert r.status_code == 413
+
+        monkeypatch.setattr(settings, "BULK_IMPORT_MAX_BODY_BYTES", 10)
+        r = await client.post("/users/import", content=body, headers=auth)
+        assert r.status_code == 413
+
+    run_api_test(async_test)
@@ -0,0 +1,44 @@
+import anyio
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.session import InstrumentedQueuePool, engine_options, pool_stats
+
+
+def test_sqlite_urls_keep_default_pooling():
+    """Pool sizing only applies to server databases"""
+    assert engine_options("sqlite+aiosqlite:///:memory:") == {}
+    options = engine_options("postgresql+asyncpg://u:p@db/authdb")
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert {"pool_size", "max_overflow", "pool_timeout"} <= set(options)
+
+
+def test_pool_stats_report_saturation(tmp_path):
+    """Checked-out, overflow and timeout counts reflect pool pressure"""
+
+    async def scenario():
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+            poolclass=InstrumentedQueuePool,
+            pool_size=1,
+            max_overflow=1,
+            pool_timeout=0.1,
+        )
+        first = await engine.connect()
+        second = await engine.connect()
+        await second.execute(text("select 1"))
+        stats = pool_stats(engine)
+        assert stats["checked_out"] == 2
+        assert stats["overflow"] == 1 and stats["max_overflow"] == 1
+        with pytest.raises(exc.TimeoutError):
+            await engine.connect()
+        await first.close()
+        await second.close()
+        stats = pool_stats(engine)
+        assert stats["timeouts"] == 1
+        assert stats["checkouts"] == 3
+        assert stats["max_checkout_ms"] >= 100
+        await engine.dispose()
+
+    anyio.run(scenario)
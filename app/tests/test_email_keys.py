@@ -0,0 +1,127 @@
+import uuid
+
+import pytest
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.emails import normalize_email
+from app.core.security import get_password_hash
+from app.db import crud
+from app.db.crud import new_user_values
+from app.db.email_keys import backfill_email_keys
+from app.db.models import User
+from app.tests.conftest import (
+    SENT_TOKENS,
+    AsyncSessionLocal,
+    create_verified_user,
+    engine_test,
+    login,
+    run_api_test,
+)
+
+
+def test_normalize_email_casefolds_and_encodes_domain():
+    assert normalize_email(" Bob@Bücher.Example. ") == "bob@xn--bcher-kva.example"
+    assert normalize_email("BOB@xn--bcher-kva.example") == "bob@xn--bcher-kva.example"
+
+
+def test_emails_match_regardless_of_case():
+    """Registration and login treat differently cased emails as one account"""
+
+    async def async_test(client):
+        r = await client.post(
+            "/auth/register",
+            json={"email": "Mixed.Case@Example.com", "password": "StrongPassw0rd!"},
+        )
+        assert r.status_code == 201
+        r = await client.post(
+            "/auth/register",
+            json={"email": "mixed.case@example.com", "password": "StrongPassw0rd!"},
+        )
+        assert r.status_code == 400
+
+        # EmailStr lowercases the domain but keeps the local part as sent
+        token = SENT_TOKENS["Mixed.Case@example.com"]
+        await client.get(f"/auth/verify-email?token={token}")
+        await login(client, "MIXED.CASE@example.com")
+
+    run_api_test(async_test)
+
+
+def test_backfill_fills_keys_and_skips_case_duplicates():
+    """Rows without a key get one in batches; case duplicates are reported"""
+
+    async def async_test(client):
+        await create_verified_user("Solo@example.com")
+        digest = get_password_hash("StrongPassw0rd!", rounds=4)
+        async with AsyncSessionLocal() as session:
+            # As left behind by a release that did not write the key
+            await session.execute(update(User).values(email_normalized=None))
+            await session.execute(
+                insert(User.__table__),
+                [
+                    new_user_values(email, digest, email_normalized=None)
+                    for email in ("Dup@Example.com", "dup@example.com")
+                ],
+            )
+            await session.commit()
+        # Rows without a key are still found by their exact address
+        await login(client, "Solo@example.com")
+
+        async with engine_test.connect() as conn:
+            _, duplicates = await conn.run_sync(backfill_email_keys, 2)
+            await conn.commit()
+        assert len(duplicates) == 1
+        async with AsyncSessionLocal() as session:
+            unkeyed = await session.execute(
+                select(User.email).where(User.email_normalized.is_(None))
+            )
+            assert unkeyed.scalars().all() == duplicates
+
+        await login(client, "solo@example.com")
+        async with AsyncSessionLocal() as session:
+            user = User(id=uuid.uuid4(), email="SOLO@example.com", hashed_password="x")
+            session.add(user)
+            with pytest.raises(IntegrityError):
+                await session.commit()
+
+    run_api_test(async_test)
+
+
+def test_unkeyed_duplicates_can_still_be_updated():
+    """ORM writes to a row left without a key do not try to claim a taken key"""
+
+    async def async_test(client):
+        await create_verified_user("twin@example.com")
+        digest = get_password_hash("StrongPassw0rd!", rounds=4)
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                insert(User.__table__),
+                [
+                    new_user_values(
+                        "Twin@example.com",
+                        digest,
+                        email_normalized=None,
+                        email_verified=True,
+                    )
+                ],
+            )
+            await session.commit()
+        async with AsyncSessionLocal() as session:
+            # The exact address wins over the keyed "twin@example.com"
+            twin = await crud.get_user_by_email(session, "Twin@example.com")
+            assert twin.email_normalized is None
+            twin.is_superuser = True
+            await session.commit()
+
+        tokens = await login(client, "Twin@example.com")
+        auth = {"Authorization": f"Bearer {tokens['access_token']}"}
+        r = await client.put(
+            "/users/me", json={"password": "NewStrongPassw0rd!"}, headers=auth
+        )
+        assert r.status_code == 200, r.text
+        async with AsyncSessionLocal() as session:
+            twin = await session.get(User, twin.id)
+        assert twin.email_normalized is None and twin.is_superuser
+
+    run_api_test(async_test)
@@ -0,0 +1,217 @@
+import asyncio
+import time
+import uuid
+
+import anyio
+
+from app.core import hashing
+from app.core.hashing import (
+    HashingOverloadedError,
+    PasswordHasher,
+    hash_password,
+    hasher,
+    verify_password,
+)
+from app.core.security import (
+    calibrate_bcrypt_rounds,
+    get_bcrypt_rounds,
+    get_password_hash,
+    needs_rehash,
+    set_bcrypt_rounds,
+)
+from app.core.security import verify_password as verify_password_sync
+from app.db.models import User
+from app.tests.conftest import AsyncSessionLocal, run_api_test
+
+
+def test_hash_and_verify_roundtrip():
+    """Hashes produced in the pool verify both in the pool and in-process"""
+
+    async def async_test():
+        hashed = await hash_password("StrongPassw0rd!")
+        assert verify_password_sync("StrongPassw0rd!", hashed)
+        assert await verify_password("StrongPassw0rd!", hashed)
+        assert not await verify_password("WrongPassw0rd!", hashed)
+
+    anyio.run(async_test)
+
+
+def test_hashing_does_not_block_event_loop():
+    """The event loop keeps scheduling other tasks while a hash is computed"""
+    hashed = get_password_hash("StrongPassw0rd!")
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(time.perf_counter())
+            await anyio.sleep(0.01)
+
+    async def async_test():
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(ticker)
+            # Warm the pool so process start-up is not measured
+            await verify_password("StrongPassw0rd!", hashed)
+            ticks.clear()
+            await verify_password("StrongPassw0rd!", hashed)
+            tg.cancel_scope.cancel()
+
+    anyio.run(async_test)
+    assert len(ticks) >= 2
+
+
+def test_hashing_stats_track_latency():
+    """Pool metrics count completed operations and report latency"""
+    local_hasher = PasswordHasher(workers=1)
+
+    async def async_test():
+        await local_hasher.run(get_password_hash, "StrongPassw0rd!")
+
+    try:
+        anyio.run(async_test)
+    finally:
+        local_hasher.shutdown()
+
+    stats = local_hasher.snapshot()
+    assert stats["workers"] == 1
+    assert stats["submitted"] == 1
+    assert stats["completed"] == 1
+    assert stats["in_flight"] == 0
+    assert stats["max_latency_ms"] > 0
+    assert "queue_depth" in hasher.snapshot()
+
+
+def test_admission_rejects_when_saturated():
+    """Work beyond max_in_flight waits at most max_wait, then is shed"""
+    local_hasher = PasswordHasher(workers=1, max_in_flight=1, max_wait=0.05)
+
+    async def async_test():
+        results = []
+
+        async def attempt():
+            try:
+                await local_hasher.run(get_password_hash, "StrongPassw0rd!")
+                results.append("ok")
+            except HashingOverloadedError as exc:
+                results.append(exc.retry_after)
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(attempt)
+            tg.start_soon(attempt)
+        return results
+
+    try:
+        results = anyio.run(async_test)
+    finally:
+        local_hasher.shutdown()
+
+    assert sorted(results, key=str) == [1, "ok"]
+    stats = local_hasher.snapshot()
+    assert stats["rejected"] == 1
+    assert stats["in_flight"] == 0
+    assert stats["waiting"] == 0
+
+
+def test_queued_request_gets_released_slot():
+    """A waiter inherits the slot of a finishing request within max_wait"""
+    local_hasher = PasswordHasher(workers=1, max_in_flight=1, max_wait=30)
+
+    async def async_test():
+        async with anyio.create_task_group() as tg:
+            for _ in range(3):
+                tg.start_soon(local_hasher.run, get_password_hash, "StrongPassw0rd!")
+
+    try:
+        anyio.run(async_test)
+    finally:
+        local_hasher.shutdown()
+
+    stats = local_hasher.snapshot()
+    assert stats["completed"] == 3
+    assert stats["rejected"] == 0
+    assert stats["in_flight"] == 0
+
+
+def test_slot_handed_over_at_timeout_is_kept(monkeypatch):
+    """A slot released as the wait times out is not leaked"""
+    local_hasher = PasswordHasher(workers=1, max_in_flight=1, max_wait=30)
+
+    async def handover_then_timeout(waiter, timeout):
+        # What wait_for can do on 3.12+: the result arrives, TimeoutError anyway
+        local_hasher._release_slot()
+        raise asyncio.TimeoutError
+
+    async def async_test():
+        await local_hasher._acquire_slot()
+        monkeypatch.setattr(asyncio, "wait_for", handover_then_timeout)
+        await local_hasher._acquire_slot()
+        monkeypatch.undo()
+        local_hasher._release_slot()
+
+    anyio.run(async_test)
+    stats = local_hasher.snapshot()
+    assert stats["rejected"] == 0
+    assert stats["in_flight"] == 0 and stats["waiting"] == 0
+
+
+def test_saturated_register_returns_503(monkeypatch):
+    """Registration is shed with 503 and Retry-After when hashing is saturated"""
+    saturated = PasswordHasher(workers=1, max_in_flight=1, max_wait=0, retry_after=7)
+    saturated.stats.in_flight = 1  # pretend the only slot is taken
+    monkeypatch.setattr(hashing, "hasher", saturated)
+
+    async def async_test(client):
+        r = await client.post(
+            "/auth/register",
+            json={"email": "busy@example.com", "password": "StrongPassw0rd!"},
+        )
+        assert r.status_code == 503
+        assert r.headers["Retry-After"] == "7"
+
+    run_api_test(async_test)
+
+
+def test_calibration_stays_within_bounds():
+    """Calibration clamps to the configured min/max cost"""
+    assert calibrate_bcrypt_rounds(0, min_rounds=4, max_rounds=6)[0] == 4
+    assert calibrate_bcrypt_rounds(60_000, min_rounds=4, max_rounds=6)[0] == 6
+
+
+def test_needs_rehash_follows_configured_cost():
+    """Hashes below the configured cost are flagged; stronger ones are kept"""
+    original = get_bcrypt_rounds()
+    weak = get_password_hash("StrongPassw0rd!", rounds=4)
+    strong = get_password_hash("StrongPassw0rd!", rounds=6)
+    try:
+        set_bcrypt_rounds(5)
+        assert needs_rehash(weak)
+        assert not needs_rehash(strong)
+    finally:
+        set_bcrypt_rounds(original)
+
+
+def test_login_rehashes_weak_password_hash():
+    """A successful login transparently upgrades a hash below the current cost"""
+
+    async def async_test(client):
+        async with AsyncSessionLocal() as session:
+            user = User(
+                id=uuid.uuid4(),
+                email="rehash@example.com",
+                hashed_password=get_password_hash("StrongPassw0rd!", rounds=4),
+                email_verified=True,
+            )
+            session.add(user)
+            await session.commit()
+
+        r = await client.post(
+            "/auth/login",
+            json={"email": "rehash@example.com", "password": "StrongPassw0rd!"},
+        )
+        assert r.status_code == 200
+
+        async with AsyncSessionLocal() as session:
+            stored = await session.get(User, user.id)
+            assert stored.hashed_password.startswith(f"$2b${get_bcrypt_rounds():02d}$")
+            assert verify_password_sync("StrongPassw0rd!", stored.hashed_password)
+
+    run_api_test(async_test)
@@ -0,0 +1,73 @@
+import json
+import time
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from jose import JWTError, jwt
+from jose.exceptions import ExpiredSignatureError
+
+from app.core import security
+from app.core.jwt_codec import JWTCodec
+from app.core.keys import JWTKey, Keyring
+
+
+def test_hs256_codec_interoperates_with_jose():
+    """Tokens are byte-compatible with python-jose in both directions"""
+    codec = JWTCodec("HS256", kid="k1", secret="s3cret")
+    claims = {"sub": "1", "exp": int(time.time()) + 60, "jti": "abc"}
+    token = codec.encode(claims)
+    assert jwt.decode(token, "s3cret", algorithms=["HS256"]) == claims
+    assert jwt.get_unverified_header(token)["kid"] == "k1"
+
+    jose_token = jwt.encode(claims, "s3cret", algorithm="HS256", headers={"kid": "k1"})
+    assert codec.decode(jose_token) == claims
+
+
+def test_codec_rejects_bad_tokens():
+    """Tampered, expired and exp-less tokens are refused"""
+    codec = JWTCodec("HS256", kid="k1", secret="s3cret")
+    token = codec.encode({"sub": "1", "exp": int(time.time()) + 60})
+    header, payload, signature = token.split(".")
+    forged = codec.encode({"sub": "2", "exp": int(time.time()) + 60}).split(".")[1]
+    with pytest.raises(JWTError):
+        codec.decode(f"{header}.{forged}.{signature}")
+    with pytest.raises(ExpiredSignatureError):
+        codec.decode(codec.encode({"sub": "1", "exp": int(time.time()) - 1}))
+    with pytest.raises(JWTError):
+        codec.decode(codec.encode({"sub": "1"}))
+    with pytest.raises(JWTError):
+        codec.decode("not-a-token")
+
+
+def test_eddsa_keys_sign_and_publish(monkeypatch):
+    """Ed25519 keys sign tokens and are published as OKP JWKs"""
+    pem = (
+        ed25519.Ed25519PrivateKey.generate()
+        .private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        .decode()
+    )
+    ring = Keyring([JWTKey("ed-1", "EdDSA", private_key=pem)])
+    monkeypatch.setattr(security, "keyring", ring)
+    token = security.create_access_token(subject="9")
+    assert security.decode_token(token)["sub"] == "9"
+    assert jwt.get_unverified_header(token)["alg"] == "EdDSA"
+    (jwk,) = json.loads(ring.jwks()[0])["keys"]
+    assert jwk["kty"] == "OKP" and jwk["crv"] == "Ed25519"
+
+
+def test_header_algorithm_must_match_key(monkeypatch):
+    """A token naming a known kid with another algorithm is refused"""
+    monkeypatch.setattr(security, "keyring", Keyring([JWTKey("k1", "HS256", "s3cret")]))
+    token = jwt.encode(
+        {"sub": "1", "exp": int(time.time()) + 60},
+        "s3cret",
+        algorithm="HS512",
+        headers={"kid": "k1"},
+    )
+    with pytest.raises(JWTError):
+        security.decode_token(token)
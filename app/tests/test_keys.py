@@ -0,0 +1,169 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from jose import JWTError, jwt
+
+from app.core import security
+from app.core.config import settings
+from app.core.keys import JWTKey, Keyring
+from app.tests.conftest import run_api_test
+
+
+def _rotating_keyring(now):
+    return Keyring(
+        [
+            JWTKey("2024-a", "HS256", "old-secret", retire_at=now + timedelta(hours=1)),
+            JWTKey("2024-b", "HS256", "new-secret", active_from=now),
+        ]
+    )
+
+
+def test_signing_key_switches_at_activation_time():
+    """The scheduled key takes over signing without touching verification"""
+    now = datetime.now(timezone.utc)
+    ring = _rotating_keyring(now)
+    assert ring.signing_key(now - timedelta(seconds=1)).kid == "2024-a"
+    assert ring.signing_key(now).kid == "2024-b"
+    assert ring.verification_key("2024-a", now).secret == "old-secret"
+    assert ring.verification_key("2024-a", now + timedelta(hours=2)) is None
+    assert ring.verification_key("unknown", now) is None
+
+
+def test_tokens_survive_rotation(monkeypatch):
+    """Tokens signed before a rotation still verify afterwards"""
+    now = datetime.now(timezone.utc)
+    old_ring = Keyring([JWTKey("2024-a", "HS256", "old-secret")])
+    monkeypatch.setattr(security, "keyring", old_ring)
+    old_token = security.create_access_token(subject="1")
+    assert jwt.get_unverified_header(old_token)["kid"] == "2024-a"
+
+    monkeypatch.setattr(security, "keyring", _rotating_keyring(now))
+    new_token = security.create_access_token(subject="1")
+    assert jwt.get_unverified_header(new_token)["kid"] == "2024-b"
+    assert security.decode_token(old_token)["sub"] == "1"
+    assert security.decode_token(new_token)["sub"] == "1"
+
+
+def test_unknown_kid_and_legacy_tokens(monkeypatch):
+    """Unknown kids are rejected; kid-less tokens need a "default" keyring entry"""
+    monkeypatch.setattr(
+        security, "keyring", Keyring([JWTKey("2024-a", "HS256", "old-secret")])
+    )
+    forged = jwt.encode(
+        {"sub": "1", "exp": 9999999999},
+        "whatever",
+        algorithm="HS256",
+        headers={"kid": "nope"},
+    )
+    with pytest.raises(JWTError):
+        security.decode_token(forged)
+
+    now = datetime.now(timezone.utc)
+    legacy = jwt.encode(
+        {"sub": "1", "exp": now + timedelta(minutes=5)},
+        settings.SECRET_KEY,
+        algorithm="HS256",
+    )
+    # A configured keyring does not silently trust SECRET_KEY
+    with pytest.raises(JWTError):
+        security.decode_token(legacy)
+
+    default = JWTKey("default", "HS256", settings.SECRET_KEY)
+    monkeypatch.setattr(security, "keyring", Keyring([default]))
+    assert security.decode_token(legacy)["sub"] == "1"
+
+    retired = JWTKey("default", "HS256", settings.SECRET_KEY, retire_at=now)
+    monkeypatch.setattr(
+        security, "keyring", Keyring([JWTKey("2024-a", "HS256", "s"), retired])
+    )
+    with pytest.raises(JWTError):
+        security.decode_token(legacy)
+
+
+def test_malformed_kid_is_a_401(monkeypatch):
+    """A non-string kid header is an invalid token, not a server error"""
+    monkeypatch.setattr(
+        security, "keyring", Keyring([JWTKey("2024-a", "HS256", "old-secret")])
+    )
+    token = jwt.encode(
+        {"sub": "1", "exp": 9999999999},
+        "old-secret",
+        algorithm="HS256",
+        headers={"kid": ["2024-a"]},
+    )
+    with pytest.raises(JWTError):
+        security.decode_token(token)
+
+    async def async_test(client):
+        r = await client.get("/users/me", headers={"Authorization": f"Bearer {token}"})
+        assert r.status_code == 401
+
+    run_api_test(async_test)
+
+
+@pytest.mark.parametrize(
+    "entry",
+    [
+        {"kid": "old", "algorithm": "HS256"},
+        {"kid": "old", "algorithm": "HS256", "secret": ""},
+        {"kid": "ec", "algorithm": "ES256"},
+    ],
+)
+def test_keyring_entries_without_key_material_fail_at_load(monkeypatch, entry):
+    """An HS key without a secret would accept forgeries; refuse to start"""
+    monkeypatch.setattr(settings, "JWT_KEYS", json.dumps([entry]))
+    with pytest.raises(ValueError, match="has no"):
+        Keyring.from_settings()
+
+
+def _es256_key(kid, **kwargs):
+    private = ec.generate_private_key(ec.SECP256R1())
+    pem = private.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    return JWTKey(kid, "ES256", private_key=pem, **kwargs)
+
+
+def test_es256_tokens_verify_offline_from_jwks(monkeypatch):
+    """Another service can verify our tokens with only the published JWKS"""
+    monkeypatch.setattr(security, "keyring", Keyring([_es256_key("ec-1")]))
+    token = security.create_access_token(subject="7")
+    assert security.decode_token(token)["sub"] == "7"
+
+    async def async_test(client):
+        r = await client.get("/.well-known/jwks.json")
+        assert r.status_code == 200
+        assert "max-age" in r.headers["cache-control"]
+        jwks = r.json()
+        assert [k["kid"] for k in jwks["keys"]] == ["ec-1"]
+        assert "d" not in jwks["keys"][0]
+        payload = jwt.decode(token, jwks["keys"][0], algorithms=["ES256"])
+        assert payload["sub"] == "7"
+
+        r = await client.get(
+            "/.well-known/jwks.json", headers={"If-None-Match": r.headers["etag"]}
+        )
+        assert r.status_code == 304
+
+    run_api_test(async_test)
+
+
+def test_jwks_publishes_scheduled_keys_and_hides_secrets():
+    """Upcoming keys are published early; HMAC and retired keys never are"""
+    now = datetime.now(timezone.utc)
+    ring = Keyring(
+        [
+            JWTKey("hs", "HS256", "shared-secret"),
+            _es256_key("old", retire_at=now - timedelta(minutes=1)),
+            _es256_key("next", active_from=now + timedelta(days=1)),
+        ]
+    )
+    body, etag = ring.jwks(now)
+    assert [k["kid"] for k in json.loads(body)["keys"]] == ["next"]
+    assert ring.signing_key(now).kid == "hs"
+    assert ring.jwks(now) == (body, etag)
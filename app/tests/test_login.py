@@ -0,0 +1,84 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.db import crud
+from app.db.crud import get_user_by_email
+from app.db.models import LoginLockout
+from app.db.user_queries import record_failed_login
+from app.tests.conftest import (
+    AsyncSessionLocal,
+    create_verified_user,
+    engine_test,
+    login,
+    run_api_test,
+)
+
+
+def test_failed_logins_lock_account_at_configured_limit(monkeypatch):
+    """MAX_LOGIN_ATTEMPTS failures lock the account and reset the counter"""
+    monkeypatch.setattr(settings, "MAX_LOGIN_ATTEMPTS", 3)
+
+    async def async_test(client):
+        user = await create_verified_user("locked@example.com")
+        for _ in range(3):
+            r = await client.post(
+                "/auth/login",
+                json={"email": "locked@example.com", "password": "WrongPass1!"},
+            )
+            assert r.status_code == 401
+        r = await client.post(
+            "/auth/login",
+            json={"email": "locked@example.com", "password": "StrongPassw0rd!"},
+        )
+        assert r.status_code == 403
+        async with AsyncSessionLocal() as session:
+            stored = await session.get(LoginLockout, user.id)
+        assert stored.failed_attempts == 0 and stored.locked_until is not None
+
+    run_api_test(async_test)
+
+
+def test_concurrent_failures_are_not_lost():
+    """Increments happen in the database, not on a stale copy of the row"""
+
+    async def async_test(client):
+        await create_verified_user("raced@example.com")
+        now = datetime.now(timezone.utc)
+        async with AsyncSessionLocal() as first, AsyncSessionLocal() as second:
+            # Both requests read the row before either records its failure
+            a = await get_user_by_email(first, "raced@example.com")
+            b = await get_user_by_email(second, "raced@example.com")
+            assert await record_failed_login(first, a.id, now) is None
+            await first.commit()
+            assert await record_failed_login(second, b.id, now) is None
+            await second.commit()
+        async with AsyncSessionLocal() as session:
+            stored = await session.get(LoginLockout, a.id)
+        assert stored.failed_attempts == 2
+
+    run_api_test(async_test)
+
+
+def test_clean_login_does_not_update_user_row(monkeypatch):
+    """A successful login with nothing to reset writes only the refresh token"""
+    # Test users are hashed at a low cost, which would otherwise be upgraded
+    monkeypatch.setattr(crud, "needs_rehash", lambda hashed: False)
+
+    async def async_test(client):
+        await create_verified_user("clean@example.com")
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine_test.sync_engine, "before_cursor_execute", record)
+        try:
+            await login(client, "clean@example.com")
+        finally:
+            event.remove(engine_test.sync_engine, "before_cursor_execute", record)
+        assert not [s for s in statements if s.startswith("UPDATE user")]
+        assert len([s for s in statements if s.startswith("SELECT")]) == 1
+
+    run_api_test(async_test)
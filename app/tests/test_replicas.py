@@ -0,0 +1,99 @@
+import anyio
+from sqlalchemy import insert, update
+from sqlmodel import SQLModel
+
+from app.core.config import settings
+from app.db import replicas
+from app.db.models import User
+from app.db.replicas import Replica, ReplicaRouter
+from app.db.token_versions import forget_token_version
+from app.db.user_cache import forget_user
+from app.tests.conftest import (
+    AsyncSessionLocal,
+    create_verified_user,
+    engine_test,
+    login,
+    run_api_test,
+)
+
+
+def test_router_strategies_and_health_checks(tmp_path):
+    """Unhealthy replicas are skipped; strategies pick among the rest"""
+    good = Replica("good", engine_test)
+    other = Replica("other", engine_test)
+    broken_engine = replicas.create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}"
+    )
+    broken = Replica("broken", broken_engine)
+    router = ReplicaRouter([good, other, broken])
+    anyio.run(router.check_all)
+    assert not broken.healthy and broken.failures == 1
+    assert good.healthy and good.latency > 0
+    assert {router.choose().name for _ in range(4)} == {"good", "other"}
+
+    other.latency = good.latency / 2
+    router.strategy = "least_latency"
+    assert router.choose() is other
+    good.healthy = other.healthy = False
+    assert router.choose() is None
+
+
+def test_reads_go_to_replica_until_client_writes(monkeypatch):
+    """Read-only dependencies use replicas, recent writers stay on the primary"""
+    replica = Replica("test", engine_test)
+    router = ReplicaRouter([replica])
+    monkeypatch.setattr(replicas, "replica_router", router)
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_URLS", "configured")
+
+    async def async_test(client):
+        await create_verified_user("replica@example.com")
+        r = await client.post(
+            "/auth/login",
+            json={"email": "replica@example.com", "password": "StrongPassw0rd!"},
+        )
+        assert r.status_code == 200
+        assert "read_primary" in r.headers["set-cookie"]
+        auth = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+        client.cookies.clear()
+        assert (await client.get("/users/me", headers=auth)).status_code == 200
+        assert replica.sessions == 1
+
+        client.cookies.set("read_primary", "1")
+        assert (await client.get("/users/me", headers=auth)).status_code == 200
+        assert replica.sessions == 1
+        assert router.primary_reads == 1
+
+    run_api_test(async_test)
+
+
+def test_lagging_replica_cannot_resurrect_revoked_tokens(monkeypatch, tmp_path):
+    """Token versions are checked on the primary even when reads use a replica"""
+    lagging = replicas.create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'r.db'}")
+    replica = Replica("lagging", lagging)
+    monkeypatch.setattr(replicas, "replica_router", ReplicaRouter([replica]))
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_URLS", "configured")
+
+    async def async_test(client):
+        user = await create_verified_user("lagging@example.com")
+        tokens = await login(client, user.email)
+        auth = {"Authorization": f"Bearer {tokens['access_token']}"}
+        client.cookies.clear()
+        # The replica keeps the row as it was before the revocation below
+        async with lagging.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+            await conn.execute(insert(User.__table__), [user.model_dump()])
+        assert (await client.get("/users/me", headers=auth)).status_code == 200
+        assert replica.sessions == 1
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(User).where(User.id == user.id).values(token_version=1)
+            )
+            await session.commit()
+        forget_token_version(user.id)
+        forget_user(user.id)
+
+        assert (await client.get("/users/me", headers=auth)).status_code == 401
+        await lagging.dispose()
+
+    run_api_test(async_test)
@@ -0,0 +1,113 @@
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.core.revocation import BloomFilter, RevocationIndex
+from app.core.security import create_access_token, decode_token
+from app.db.models import RevokedToken
+from app.db.revocations import revocation_index, sync_revocations
+from app.tests.conftest import (
+    AsyncSessionLocal,
+    create_verified_user,
+    login,
+    run_api_test,
+)
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """Every added key is reported present, at about a byte per key"""
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [str(uuid.uuid4()) for _ in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(1000))
+    assert false_positives < 50
+    assert len(bloom.bits) / 1000 < 2
+
+
+def test_revocation_index_drops_expired_buckets():
+    """Buckets are discarded once all their tokens have expired"""
+    index = RevocationIndex(bucket_seconds=1, capacity=10, error_rate=0.01)
+    exp = time.time() + 1.5
+    index.add("short-lived", exp)
+    assert index.might_contain("short-lived", exp)
+    assert not index.might_contain("other", exp)
+    index._buckets[index._bucket(time.time()) - 1] = index._buckets.pop(
+        index._bucket(exp)
+    )
+    index.expire()
+    assert index.stats()["buckets"] == 0
+
+
+def test_logout_revokes_access_token():
+    """A logged-out access token is rejected on the next request"""
+
+    async def async_test(client):
+        await create_verified_user("logout@example.com")
+        tokens = await login(client, "logout@example.com")
+        auth = {"Authorization": f"Bearer {tokens['access_token']}"}
+        assert (await client.get("/users/me", headers=auth)).status_code == 200
+
+        r = await client.post(
+            "/auth/logout",
+            json={"refresh_token": tokens["refresh_token"]},
+            headers=auth,
+        )
+        assert r.status_code == 200
+        assert (await client.get("/users/me", headers=auth)).status_code == 401
+        r = await client.post(
+            "/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+        )
+        assert r.status_code == 401
+
+    run_api_test(async_test)
+
+
+def test_sync_picks_up_revocations_from_other_workers():
+    """Revocations written by another process reach the local index on sync"""
+
+    async def async_test(client):
+        user = await create_verified_user("elsewhere@example.com")
+        token = create_access_token(subject=str(user.id))
+        payload = decode_token(token)
+        async with AsyncSessionLocal() as session:
+            session.add(
+                RevokedToken(
+                    jti=payload["jti"],
+                    expires_at=datetime.fromtimestamp(payload["exp"], tz=timezone.utc),
+                )
+            )
+            await session.commit()
+
+        auth = {"Authorization": f"Bearer {token}"}
+        assert (await client.get("/users/me", headers=auth)).status_code == 200
+        async with AsyncSessionLocal() as session:
+            assert await sync_revocations(session) >= 1
+        assert revocation_index.might_contain(payload["jti"], payload["exp"])
+        assert (await client.get("/users/me", headers=auth)).status_code == 401
+
+    run_api_test(async_test)
+
+
+def test_sync_rereads_late_committed_revocations():
+    """A revocation stamped before the last sync is still picked up"""
+
+    async def async_test(client):
+        user = await create_verified_user("late@example.com")
+        payload = decode_token(create_access_token(subject=str(user.id)))
+        async with AsyncSessionLocal() as session:
+            await sync_revocations(session)
+            # As written by a transaction that started well before this sync
+            session.add(
+                RevokedToken(
+                    jti=payload["jti"],
+                    expires_at=datetime.fromtimestamp(payload["exp"], tz=timezone.utc),
+                    revoked_at=datetime.now(timezone.utc) - timedelta(seconds=60),
+                )
+            )
+            await session.commit()
+            await sync_revocations(session)
+        assert revocation_index.might_contain(payload["jti"], payload["exp"])
+
+    run_api_test(async_test)
@@ -0,0 +1,219 @@
+from app.api import deps
+from app.core import security
+from app.core.config import settings
+from app.core.security import create_access_token, decode_token
+from app.db import user_cache
+from app.db.models import RefreshToken
+from app.tests.conftest import (
+    AsyncSessionLocal,
+    create_verified_user,
+    engine_test,
+    login,
+    run_api_test,
+)
+
+
+def test_stateless_token_serves_me_without_database(monkeypatch):
+    """Claims-carrying access tokens resolve /users/me with no user lookup"""
+    monkeypatch.setattr(settings, "STATELESS_ACCESS_TOKENS", True)
+
+    async def async_test(client):
+        user = await create_verified_user("stateless@example.com")
+        tokens = await login(client, "stateless@example.com")
+        payload = decode_token(tokens["access_token"])
+        assert payload["email"] == "stateless@example.com"
+        assert payload["verified"] is True
+
+        async def no_db(*args, **kwargs):
+            raise AssertionError("user lookup should be skipped")
+
+        monkeypatch.setattr(deps, "get_user_snapshot", no_db)
+        monkeypatch.setattr(user_cache, "fetch_user_snapshot", no_db)
+        r = await client.get(
+            "/users/me", headers={"Authorization": f"Bearer {tokens['access_token']}"}
+        )
+        assert r.status_code == 200
+        assert r.json()["id"] == str(user.id)
+        assert r.json()["email"] == "stateless@example.com"
+
+    run_api_test(async_test)
+
+
+def test_claimless_token_falls_back_to_database():
+    """Tokens without user claims still work through a database lookup"""
+
+    async def async_test(client):
+        user = await create_verified_user("plain@example.com")
+        token = create_access_token(subject=str(user.id))
+        assert "email" not in decode_token(token)
+        r = await client.get("/users/me", headers={"Authorization": f"Bearer {token}"})
+        assert r.status_code == 200
+        assert r.json()["email"] == "plain@example.com"
+
+    run_api_test(async_test)
+
+
+def test_admin_revocation_invalidates_outstanding_tokens(monkeypatch):
+    """Bumping the token version rejects tokens issued before it"""
+    monkeypatch.setattr(settings, "STATELESS_ACCESS_TOKENS", True)
+
+    async def async_test(client):
+        await create_verified_user("revokee@example.com")
+        await create_verified_user("revoker@example.com", is_superuser=True)
+        user_tokens = await login(client, "revokee@example.com")
+        admin_tokens = await login(client, "revoker@example.com")
+        user_auth = {"Authorization": f"Bearer {user_tokens['access_token']}"}
+        admin_auth = {"Authorization": f"Bearer {admin_tokens['access_token']}"}
+
+        assert (await client.get("/users/me", headers=user_auth)).status_code == 200
+        user_id = decode_token(user_tokens["access_token"])["sub"]
+        r = await client.post(f"/users/{user_id}/revoke-tokens", headers=admin_auth)
+        assert r.status_code == 200
+
+        assert (await client.get("/users/me", headers=user_auth)).status_code == 401
+        fresh = await login(client, "revokee@example.com")
+        assert decode_token(fresh["access_token"])["ver"] == 1
+        r = await client.get(
+            "/users/me", headers={"Authorization": f"Bearer {fresh['access_token']}"}
+        )
+        assert r.status_code == 200
+
+    run_api_test(async_test)
+
+
+def test_password_change_revokes_existing_tokens():
+    """Changing the password invalidates tokens issued with the old one"""
+
+    async def async_test(client):
+        await create_verified_user("changer@example.com")
+        tokens = await login(client, "changer@example.com")
+        auth = {"Authorization": f"Bearer {tokens['access_token']}"}
+        r = await client.put(
+            "/users/me", json={"password": "N3wStrongPass!"}, headers=auth
+        )
+        assert r.status_code == 200
+        assert (await client.get("/users/me", headers=auth)).status_code == 401
+        await login(client, "changer@example.com", "N3wStrongPass!")
+
+    run_api_test(async_test)
+
+
+def test_refresh_rotates_token_pair():
+    """A refresh token is exchanged for a new pair in the same family"""
+
+    async def async_test(client):
+        await create_verified_user("refresher@example.com")
+        tokens = await login(client, "refresher@example.com")
+
+        r = await client.post(
+            "/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+        )
+        assert r.status_code == 200
+        rotated = r.json()
+        assert rotated["refresh_token"] != tokens["refresh_token"]
+        r = await client.get(
+            "/users/me",
+            headers={"Authorization": f"Bearer {rotated['access_token']}"},
+        )
+        assert r.status_code == 200
+
+        async with AsyncSessionLocal() as session:
+            old = await session.get(
+                RefreshToken, decode_token(tokens["refresh_token"])["jti"]
+            )
+            new = await session.get(
+                RefreshToken, decode_token(rotated["refresh_token"])["jti"]
+            )
+            assert old.rotated_at is not None
+            assert new.family_id == old.family_id
+            assert new.token_hash != rotated["refresh_token"]
+
+    run_api_test(async_test)
+
+
+def test_refresh_token_reuse_revokes_family():
+    """Replaying a rotated refresh token kills every token in its family"""
+
+    async def async_test(client):
+        await create_verified_user("replayed@example.com")
+        tokens = await login(client, "replayed@example.com")
+        r = await client.post(
+            "/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+        )
+        rotated = r.json()
+
+        replay = await client.post(
+            "/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+        )
+        assert replay.status_code == 401
+        r = await client.post(
+            "/auth/refresh", json={"refresh_token": rotated["refresh_token"]}
+        )
+        assert r.status_code == 401
+
+    run_api_test(async_test)
+
+
+def test_deleting_a_user_cascades_to_refresh_tokens():
+    """Refresh tokens go with their user (foreign key ON DELETE CASCADE)"""
+
+    async def async_test(client):
+        await create_verified_user("refresh-gone@example.com")
+        tokens = await login(client, "refresh-gone@example.com")
+        jti = decode_token(tokens["refresh_token"])["jti"]
+        async with engine_test.connect() as conn:
+            # SQLite enforces foreign keys only when asked to
+            await conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+        try:
+            auth = {"Authorization": f"Bearer {tokens['access_token']}"}
+            assert (await client.delete("/users/me", headers=auth)).status_code == 200
+            async with AsyncSessionLocal() as session:
+                assert await session.get(RefreshToken, jti) is None
+        finally:
+            async with engine_test.connect() as conn:
+                await conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+
+    run_api_test(async_test)
+
+
+def test_token_types_are_not_interchangeable():
+    """Access tokens cannot refresh, refresh tokens cannot authenticate"""
+
+    async def async_test(client):
+        await create_verified_user("types@example.com")
+        tokens = await login(client, "types@example.com")
+        r = await client.post(
+            "/auth/refresh", json={"refresh_token": tokens["access_token"]}
+        )
+        assert r.status_code == 401
+        r = await client.get(
+            "/users/me",
+            headers={"Authorization": f"Bearer {tokens['refresh_token']}"},
+        )
+        assert r.status_code == 401
+
+    run_api_test(async_test)
+
+
+def test_repeated_bearer_skips_decoding(monkeypatch):
+    """A token seen before is served from the decode cache, revocation still applies"""
+
+    async def async_test(client):
+        await create_verified_user("cached@example.com")
+        tokens = await login(client, "cached@example.com")
+        auth = {"Authorization": f"Bearer {tokens['access_token']}"}
+        assert (await client.get("/users/me", headers=auth)).status_code == 200
+
+        def no_decode(token):
+            raise AssertionError("token should come from the cache")
+
+        monkeypatch.setattr(security, "decode_token", no_decode)
+        hits = security.decoded_token_cache_stats()["hits"]
+        assert (await client.get("/users/me", headers=auth)).status_code == 200
+        assert security.decoded_token_cache_stats()["hits"] == hits + 1
+
+        r = await client.post("/auth/logout", headers=auth)
+        assert r.status_code == 200
+        assert (await client.get("/users/me", headers=auth)).status_code == 401
+
+    run_api_test(async_test)
@@ -0,0 +1,45 @@
+from app.db import user_cache
+from app.tests.conftest import create_verified_user, login, run_api_test
+
+
+def test_authenticated_reads_are_served_from_cache():
+    """Repeated requests by the same user resolve it without reloading the row"""
+
+    async def async_test(client):
+        await create_verified_user("cached-user@example.com")
+        tokens = await login(client, "cached-user@example.com")
+        auth = {"Authorization": f"Bearer {tokens['access_token']}"}
+        assert (await client.get("/users/me", headers=auth)).status_code == 200
+        hits = user_cache.cache_stats()["hits"]
+        assert (await client.get("/users/me", headers=auth)).status_code == 200
+        assert user_cache.cache_stats()["hits"] == hits + 1
+
+    run_api_test(async_test)
+
+
+def test_admin_writes_invalidate_cached_records():
+    """Mutations through the users API are visible on the next read"""
+
+    async def async_test(client):
+        user = await create_verified_user("cache-target@example.com")
+        await create_verified_user("cache-admin@example.com", is_superuser=True)
+        tokens = await login(client, "cache-admin@example.com")
+        auth = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+        r = await client.get(f"/users/{user.id}", headers=auth)
+        assert r.json()["is_active"] is True
+        r = await client.post(f"/users/{user.id}/deactivate", headers=auth)
+        assert r.status_code == 200
+        r = await client.get(f"/users/{user.id}", headers=auth)
+        assert r.json()["is_active"] is False
+
+        r = await client.put(
+            f"/users/{user.id}",
+            json={"email": "cache-renamed@example.com"},
+            headers=auth,
+        )
+        assert r.status_code == 200
+        r = await client.get(f"/users/{user.id}", headers=auth)
+        assert r.json()["email"] == "cache-renamed@example.com"
+
+    run_api_test(async_test)
@@ -0,0 +1,118 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import insert
+
+from app.db import user_queries
+from app.db.crud import new_user_values
+from app.db.models import LoginLockout, User
+from app.db.records import LoginRecord, UserSnapshot
+from app.tests.conftest import (
+    AsyncSessionLocal,
+    create_verified_user,
+    engine_test,
+    login,
+    run_api_test,
+)
+
+
+@pytest.mark.parametrize("fast_path", [True, False])
+def test_hot_queries_return_records(monkeypatch, fast_path):
+    """Core and ORM paths return the same slotted records"""
+    if fast_path:
+        monkeypatch.setattr(user_queries, "FAST_PATH_DIALECTS", {"sqlite"})
+
+    async def async_test(client):
+        user = await create_verified_user("hot@example.com", is_superuser=True)
+        async with AsyncSessionLocal() as session:
+            by_id = await user_queries.fetch_user_snapshot(session, user.id)
+            by_email = await user_queries.fetch_user_snapshot_by_email(
+                session, "HOT@example.com"
+            )
+            record = await user_queries.fetch_login_record(session, "hot@example.com")
+            missing = await user_queries.fetch_login_record(session, "cold@example.com")
+        assert by_id == by_email == UserSnapshot.from_user(user)
+        assert isinstance(record, LoginRecord) and not hasattr(record, "__dict__")
+        assert record.hashed_password == user.hashed_password
+        assert record.is_superuser and missing is None
+
+    run_api_test(async_test)
+
+
+def test_successful_login_resets_lockout_and_stores_new_hash(monkeypatch):
+    """Nothing is written when clean; otherwise the lockout row is deleted"""
+    monkeypatch.setattr(user_queries, "FAST_PATH_DIALECTS", {"sqlite"})
+
+    async def async_test(client):
+        user = await create_verified_user("reset@example.com")
+        async with AsyncSessionLocal() as session:
+            record = await user_queries.fetch_login_record(session, user.email)
+            assert not await user_queries.record_successful_login(session, record)
+
+            now = datetime.now(timezone.utc)
+            await user_queries.record_failed_login(session, user.id, now)
+            await session.commit()
+            record = await user_queries.fetch_login_record(session, user.email)
+            assert record.failed_attempts == 1
+            assert await user_queries.record_successful_login(
+                session, record, new_hash="upgraded"
+            )
+            await session.commit()
+        async with AsyncSessionLocal() as session:
+            stored = await session.get(User, user.id)
+            lockout = await session.get(LoginLockout, user.id)
+        assert lockout is None and stored.hashed_password == "upgraded"
+
+    run_api_test(async_test)
+
+
+@pytest.mark.parametrize("fast_path", [True, False])
+def test_exact_address_wins_over_keyed_case_duplicate(monkeypatch, fast_path):
+    """The key probe is used alone unless an unkeyed duplicate may match exactly"""
+    if fast_path:
+        monkeypatch.setattr(user_queries, "FAST_PATH_DIALECTS", {"sqlite"})
+
+    async def async_test(client):
+        keyed = await create_verified_user("pair@example.com")
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                insert(User.__table__),
+                [new_user_values("Pair@example.com", "x", email_normalized=None)],
+            )
+            await session.commit()
+        async with AsyncSessionLocal() as session:
+            exact = await user_queries.fetch_login_record(session, "Pair@example.com")
+            other = await user_queries.fetch_login_record(session, "PAIR@example.com")
+            own = await user_queries.fetch_user_snapshot_by_email(
+                session, "pair@example.com"
+            )
+        assert exact.email == "Pair@example.com" and exact.id != keyed.id
+        assert other.id == own.id == keyed.id
+
+    run_api_test(async_test)
+
+
+def test_deleting_a_user_cascades_to_lockout():
+    """The lockout row goes with its user (foreign key ON DELETE CASCADE)"""
+
+    async def async_test(client):
+        user = await create_verified_user("gone@example.com")
+        async with engine_test.connect() as conn:
+            # SQLite enforces foreign keys only when asked to
+            await conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+        try:
+            tokens = await login(client, user.email)
+            async with AsyncSessionLocal() as session:
+                await user_queries.record_failed_login(
+                    session, user.id, datetime.now(timezone.utc)
+                )
+                await session.commit()
+            auth = {"Authorization": f"Bearer {tokens['access_token']}"}
+            assert (await client.delete("/users/me", headers=auth)).status_code == 200
+            async with AsyncSessionLocal() as session:
+                assert await session.get(LoginLockout, user.id) is None
+        finally:
+            async with engine_test.connect() as conn:
+                await conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+
+    run_api_test(async_test)
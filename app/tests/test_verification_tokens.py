@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlmodel import delete, select
+
+from app.core.security import token_digest
+from app.db.models import EmailVerificationToken, User
+from app.db.verification_tokens import purge_expired_verification_tokens
+from app.tests.conftest import SENT_TOKENS, AsyncSessionLocal, engine_test, run_api_test
+
+
+async def _register(client, email):
+    r = await client.post(
+        "/auth/register", json={"email": email, "password": "StrongPassw0rd!"}
+    )
+    assert r.status_code == 201
+    return SENT_TOKENS[email]
+
+
+def test_tokens_are_stored_hashed_and_single_use():
+    """Only the digest is stored and a link works exactly once"""
+
+    async def async_test(client):
+        token = await _register(client, "verify-once@example.com")
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(select(EmailVerificationToken))).scalars()
+            assert [row.token_hash for row in rows] == [token_digest(token)]
+
+        r = await client.get(f"/auth/verify-email?token={token}")
+        assert r.status_code == 200
+        r = await client.get(f"/auth/verify-email?token={token}")
+        assert r.status_code == 400
+
+    run_api_test(async_test)
+
+
+def test_expired_tokens_are_rejected_and_purged():
+    """Expired links fail and are removed by the purge job"""
+
+    async def async_test(client):
+        token = await _register(client, "verify-late@example.com")
+        async with AsyncSessionLocal() as session:
+            row = await session.get(EmailVerificationToken, token_digest(token))
+            row.expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+            await session.commit()
+
+        r = await client.get(f"/auth/verify-email?token={token}")
+        assert r.status_code == 400
+        async with AsyncSessionLocal() as session:
+            assert await purge_expired_verification_tokens(session) == 1
+
+    run_api_test(async_test)
+
+
+def test_duplicate_registration_writes_nothing():
+    """A taken email is refused atomically without a second user or token"""
+
+    async def async_test(client):
+        await _register(client, "twice@example.com")
+        r = await client.post(
+            "/auth/register",
+            json={"email": "twice@example.com", "password": "StrongPassw0rd!"},
+        )
+        assert r.status_code == 400
+        async with AsyncSessionLocal() as session:
+            users = (await session.execute(select(User))).scalars().all()
+            tokens = (await session.execute(select(EmailVerificationToken))).all()
+        assert len(users) == 1 and not users[0].email_verified
+        assert len(tokens) == 1
+
+    run_api_test(async_test)
+
+
+def test_resend_replaces_expired_link():
+    """An unverified user can get a new link; unknown emails look the same"""
+
+    async def async_test(client):
+        old = await _register(client, "resend@example.com")
+        r = await client.post(
+            "/auth/resend-verification", json={"email": "resend@example.com"}
+        )
+        assert r.status_code == 202
+        new = SENT_TOKENS["resend@example.com"]
+        assert new != old
+        assert (await client.get(f"/auth/verify-email?token={old}")).status_code == 400
+        assert (await client.get(f"/auth/verify-email?token={new}")).status_code == 200
+
+        SENT_TOKENS.clear()
+        for email in ("resend@example.com", "nobody@example.com"):
+            r = await client.post("/auth/resend-verification", json={"email": email})
+            assert r.status_code == 202
+        assert SENT_TOKENS == {}
+
+    run_api_test(async_test)
+
+
+def test_deleting_a_user_cascades_to_verification_tokens():
+    """Outstanding links go with their user (foreign key ON DELETE CASCADE)"""
+
+    async def async_test(client):
+        token = await _register(client, "verify-gone@example.com")
+        async with engine_test.connect() as conn:
+            # SQLite enforces foreign keys only when asked to
+            await conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(
+                    delete(User).where(User.email == "verify-gone@example.com")
+                )
+                await session.commit()
+                row = await session.get(EmailVerificationToken, token_digest(token))
+                assert row is None
+        finally:
+            async with engine_test.connect() as conn:
+                await conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+
+    run_api_test(async_test)